@@ -4,19 +4,28 @@ FastAPI backend for the Photo Face Detection system.
 
 from __future__ import annotations
 
-import io
+import mimetypes
 import os
+import shutil
 import subprocess
-import sys
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
+from urllib.parse import quote
 
+import anyio.to_thread
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, Response
 from loguru import logger
-from pydantic import BaseModel
+from PIL import Image
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 
 # Enable HEIC/HEIF support for iPhone photos
 try:
@@ -27,14 +36,16 @@ try:
 except ImportError:
     logger.warning("pillow-heif not installed - HEIC images may not be browser-friendly")
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from backend.database import Cluster, DatabaseManager, Face, FaceCorrection, Photo
 from backend.image_cache import (
     CACHE_DIR,
+    CACHE_MAX_BYTES,
     THUMBNAIL_SIZE,
     build_face_crop_cache,
+    build_photo_jpeg_cache,
+    encode_jpeg,
     get_face_cache_path,
+    warm_face_crop_cache,
 )
 from backend.redis_cache import RedisCache
 from backend.sync_service import SyncService
@@ -47,6 +58,7 @@ app = FastAPI(
     version="2.0.0",
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],
@@ -64,6 +76,24 @@ AUTO_SYNC_ON_STARTUP = os.getenv("AUTO_SYNC_ON_STARTUP", "true").lower() in {
     "true",
     "yes",
 }
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "200"))
+IMAGE_CACHE_CONTROL = "public, max-age=604800, immutable"
+
+# Encoded once at import; served whenever a photo or crop cannot be decoded.
+PLACEHOLDER_PHOTO_JPEG = encode_jpeg(Image.new("RGB", (800, 600), color=(128, 128, 128)))
+PLACEHOLDER_THUMBNAIL_JPEG = encode_jpeg(Image.new("RGB", THUMBNAIL_SIZE, color=(128, 128, 128)))
+PLACEHOLDER_FACE_JPEG = encode_jpeg(Image.new("RGB", (200, 200), color=(128, 128, 128)))
+
+# When the API sits behind nginx, these internal locations let nginx send image
+# files itself; see "Serving images through nginx" in the README.
+ACCEL_REDIRECT_ROOTS = [
+    (Path(os.path.abspath(root)), location.rstrip("/"))
+    for root, location in (
+        (CACHE_DIR, os.getenv("ACCEL_REDIRECT_CACHE_LOCATION", "")),
+        (os.getenv("PHOTOS_PATH", ""), os.getenv("ACCEL_REDIRECT_PHOTOS_LOCATION", "")),
+    )
+    if root and location
+]
 
 
 class PhotoInfo(BaseModel):
@@ -86,12 +116,34 @@ class FaceInfo(BaseModel):
     cluster_confidence: Optional[float]
 
 
+class RepresentativeFace(BaseModel):
+    id: int
+    photo_id: int
+    top: int
+    right: int
+    bottom: int
+    left: int
+
+
 class ClusterInfo(BaseModel):
     id: int
     name: Optional[str]
     face_count: int
     representative_face_id: Optional[int]
     is_locked: bool
+    representative_face: Optional[RepresentativeFace] = None
+
+
+class FaceInCluster(BaseModel):
+    id: int
+    photo_id: int
+    photo_path: str
+    top: int
+    right: int
+    bottom: int
+    left: int
+    confidence: float
+    cluster_confidence: Optional[float]
 
 
 class ClusterDetail(BaseModel):
@@ -100,7 +152,10 @@ class ClusterDetail(BaseModel):
     face_count: int
     representative_face_id: Optional[int]
     is_locked: bool
-    faces: List[dict]
+    faces: List[FaceInCluster]
+
+
+ClusterList = TypeAdapter(List[ClusterInfo])
 
 
 class SyncStatus(BaseModel):
@@ -132,6 +187,14 @@ class Stats(BaseModel):
     sync_status: SyncStatus
 
 
+def get_db_session():
+    session = db.get_session()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 def _invalidate_api_cache() -> None:
     cache.delete_prefix("api:")
 
@@ -144,8 +207,109 @@ def _set_cached_json(key: str, payload, ttl: int = 20) -> None:
     cache.set_json(f"api:{key}", payload, ttl=ttl)
 
 
+def _get_cached_body(key: str) -> Optional[str]:
+    return cache.get_text(f"api:{key}")
+
+
+def _set_cached_body(key: str, body: bytes, ttl: int = 20) -> None:
+    cache.set_text(f"api:{key}", body.decode(), ttl=ttl)
+
+
+def _json_body_response(body) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def _upsert_face_correction(session, face_id: int, **values) -> None:
+    statement = sqlite_insert(FaceCorrection).values(face_id=face_id, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[FaceCorrection.face_id],
+        set_={**values, "updated_at": datetime.utcnow()},
+    )
+    session.execute(statement)
+
+
+def _encode_cluster_list(payload: list[dict]) -> bytes:
+    # Rows come straight from typed columns, so skip re-validating up to
+    # `limit` models per request and let pydantic-core serialize them directly.
+    clusters = []
+    for item in payload:
+        representative_face = item.get("representative_face")
+        if representative_face is not None:
+            item = {
+                **item,
+                "representative_face": RepresentativeFace.model_construct(
+                    **representative_face
+                ),
+            }
+        clusters.append(ClusterInfo.model_construct(**item))
+    return ClusterList.dump_json(clusters, exclude_unset=True)
+
+
+def _encode_cluster_detail(payload: dict) -> bytes:
+    # Same fast path as the list: up to thousands of face rows per cluster.
+    cluster = ClusterDetail.model_construct(
+        **{
+            **payload,
+            "faces": [FaceInCluster.model_construct(**face) for face in payload["faces"]],
+        }
+    )
+    return cluster.model_dump_json().encode()
+
+
+def _file_validators(prefix: str, file_path) -> dict[str, str]:
+    stat = os.stat(file_path)
+    return {
+        "ETag": f'W/"{prefix}-{int(stat.st_mtime)}-{stat.st_size}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+
+
+def _image_headers(validators: dict[str, str]) -> dict[str, str]:
+    return {**validators, "Cache-Control": IMAGE_CACHE_CONTROL}
+
+
+def _is_not_modified(request: Request, validators: dict[str, str]) -> bool:
+    # If-None-Match wins over If-Modified-Since when a client sends both (RFC 9110).
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {value.strip() for value in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(validators["Last-Modified"]) <= since
+
+
+def _file_response(file_path, headers: dict[str, str], media_type: Optional[str] = None) -> Response:
+    absolute_path = Path(os.path.abspath(file_path))
+    for root, location in ACCEL_REDIRECT_ROOTS:
+        if not absolute_path.is_relative_to(root):
+            continue
+        relative_path = absolute_path.relative_to(root).as_posix()
+        return Response(
+            media_type=media_type or mimetypes.guess_type(absolute_path.name)[0],
+            headers={**headers, "X-Accel-Redirect": f"{location}/{quote(relative_path)}"},
+        )
+    return FileResponse(file_path, media_type=media_type, headers=headers)
+
+
+def _face_crop_response(request: Request, cache_file: Path) -> Response:
+    validators = _file_validators(cache_file.stem, cache_file)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=_image_headers(validators))
+    return _file_response(cache_file, _image_headers(validators), media_type="image/jpeg")
+
+
 @app.on_event("startup")
 async def startup_event():
+    # Blocking endpoints run on AnyIO's worker threads, which default to 40.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
     if AUTO_SYNC_ON_STARTUP:
         sync_service.start_background_sync(reason="startup")
 
@@ -170,7 +334,7 @@ async def root():
 
 
 @app.get("/stats", response_model=Stats)
-async def get_stats():
+def get_stats():
     cached = _get_cached_json("stats")
     if cached:
         return cached
@@ -185,7 +349,7 @@ async def get_stats():
 
 
 @app.get("/sync/status", response_model=SyncStatus)
-async def get_sync_status():
+def get_sync_status():
     cached = _get_cached_json("sync:status")
     if cached:
         return cached
@@ -196,7 +360,7 @@ async def get_sync_status():
 
 
 @app.post("/sync/run")
-async def run_sync(
+def run_sync(
     force_rescan: bool = Query(False, description="Reprocess already-known photos"),
     force_recluster: bool = Query(
         False, description="Force a clustering rebuild before returning"
@@ -215,96 +379,192 @@ async def run_sync(
 
 
 @app.get("/clusters", response_model=List[ClusterInfo])
-async def list_clusters(
+def list_clusters(
     skip: int = Query(0, ge=0, description="Number of clusters to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum clusters to return"),
     min_faces: int = Query(1, ge=1, description="Minimum faces per cluster"),
     search: Optional[str] = Query(None, description="Search by cluster name or id"),
+    expand: Optional[Literal["representative"]] = Query(
+        None, description="Include the representative face box with each cluster"
+    ),
+    after_face_count: Optional[int] = Query(
+        None, ge=0, description="Keyset cursor: face_count of the last cluster already shown"
+    ),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Keyset cursor: id of the last cluster already shown"
+    ),
+    session: Session = Depends(get_db_session),
 ):
-    cache_key = f"clusters:{skip}:{limit}:{min_faces}:{search or ''}"
+    if (after_face_count is None) != (after_id is None):
+        raise HTTPException(
+            status_code=400, detail="after_face_count and after_id must be given together"
+        )
+
+    cache_key = (
+        f"clusters:{skip}:{limit}:{min_faces}:{search or ''}:{expand or ''}"
+        f":{after_face_count if after_face_count is not None else ''}:{after_id or ''}"
+    )
+    # Hits hand back the already-encoded body without decoding it again.
+    cached = _get_cached_body(cache_key)
+    if cached is not None:
+        return _json_body_response(cached)
+
+    include_representative = expand == "representative"
+    columns = [
+        Cluster.id,
+        Cluster.name,
+        Cluster.face_count,
+        Cluster.representative_face_id,
+        Cluster.is_locked,
+    ]
+    if include_representative:
+        columns += [Face.photo_id, Face.top, Face.right, Face.bottom, Face.left]
+
+    query = session.query(*columns).filter(Cluster.face_count >= min_faces)
+    if include_representative:
+        query = query.outerjoin(Face, Face.id == Cluster.representative_face_id)
+    if search:
+        search_value = search.strip()
+        if search_value.isdigit():
+            query = query.filter(
+                (Cluster.id == int(search_value)) | Cluster.name.like(f"%{search_value}%")
+            )
+        else:
+            query = query.filter(Cluster.name.like(f"%{search_value}%"))
+    if after_id is not None:
+        # Seek past the previous page on the (face_count, id) index instead of
+        # scanning and discarding `skip` rows.
+        query = query.filter(tuple_(Cluster.face_count, Cluster.id) < (after_face_count, after_id))
+    query = query.order_by(Cluster.face_count.desc(), Cluster.id.desc())
+    rows = query.offset(skip).limit(limit).all()
+    payload = []
+    for row in rows:
+        item = {
+            "id": row.id,
+            "name": row.name,
+            "face_count": row.face_count,
+            "representative_face_id": row.representative_face_id,
+            "is_locked": bool(row.is_locked or row.name),
+        }
+        if include_representative:
+            item["representative_face"] = (
+                {
+                    "id": row.representative_face_id,
+                    "photo_id": row.photo_id,
+                    "top": row.top,
+                    "right": row.right,
+                    "bottom": row.bottom,
+                    "left": row.left,
+                }
+                if row.photo_id is not None
+                else None
+            )
+        payload.append(item)
+    body = _encode_cluster_list(payload)
+    _set_cached_body(cache_key, body, ttl=15)
+    return _json_body_response(body)
+
+
+@app.get("/clusters/duplicates")
+def get_duplicate_cluster_names(session: Session = Depends(get_db_session)):
+    cache_key = "clusters:duplicates"
     cached = _get_cached_json(cache_key)
-    if cached:
+    if cached is not None:
         return cached
 
-    session = db.get_session()
-    try:
-        query = session.query(Cluster).filter(Cluster.face_count >= min_faces)
-        if search:
-            search_value = search.strip()
-            if search_value.isdigit():
-                query = query.filter(
-                    (Cluster.id == int(search_value)) | Cluster.name.like(f"%{search_value}%")
-                )
-            else:
-                query = query.filter(Cluster.name.like(f"%{search_value}%"))
-        query = query.order_by(Cluster.face_count.desc(), Cluster.updated_at.desc())
-        clusters = query.offset(skip).limit(limit).all()
-        payload = [
-            {
-                "id": cluster.id,
-                "name": cluster.name,
-                "face_count": cluster.face_count,
-                "representative_face_id": cluster.representative_face_id,
-                "is_locked": bool(cluster.is_locked or cluster.name),
-            }
-            for cluster in clusters
-        ]
-        _set_cached_json(cache_key, payload, ttl=15)
-        return payload
-    finally:
-        session.close()
+    rows = (
+        session.query(
+            Cluster.name,
+            func.count(Cluster.id).label("cluster_count"),
+            func.sum(Cluster.face_count).label("face_count"),
+            func.group_concat(Cluster.id).label("cluster_ids"),
+        )
+        .filter(Cluster.name.isnot(None), Cluster.name != "")
+        .group_by(Cluster.name)
+        .having(func.count(Cluster.id) > 1)
+        .order_by(func.sum(Cluster.face_count).desc())
+        .all()
+    )
+    payload = [
+        {
+            "name": row.name,
+            "count": row.cluster_count,
+            "face_count": row.face_count or 0,
+            "cluster_ids": sorted(int(cluster_id) for cluster_id in row.cluster_ids.split(",")),
+        }
+        for row in rows
+    ]
+    _set_cached_json(cache_key, payload, ttl=15)
+    return payload
 
 
 @app.get("/clusters/{cluster_id}", response_model=ClusterDetail)
-async def get_cluster(cluster_id: int):
+def get_cluster(cluster_id: int, session: Session = Depends(get_db_session)):
     cache_key = f"cluster:{cluster_id}"
-    cached = _get_cached_json(cache_key)
-    if cached:
-        return cached
-
-    session = db.get_session()
-    try:
-        cluster = session.query(Cluster).filter_by(id=cluster_id).first()
-        if not cluster:
-            raise HTTPException(status_code=404, detail="Cluster not found")
+    cached = _get_cached_body(cache_key)
+    if cached is not None:
+        return _json_body_response(cached)
+
+    cluster = (
+        session.query(
+            Cluster.id,
+            Cluster.name,
+            Cluster.face_count,
+            Cluster.representative_face_id,
+            Cluster.is_locked,
+        )
+        .filter(Cluster.id == cluster_id)
+        .first()
+    )
+    if not cluster:
+        raise HTTPException(status_code=404, detail="Cluster not found")
 
-        faces = (
-            session.query(Face, Photo)
-            .join(Photo, Photo.id == Face.photo_id)
-            .filter(Face.cluster_id == cluster_id)
-            .order_by(Photo.scanned_at.desc().nullslast(), Face.id.desc())
-            .all()
+    faces = (
+        session.query(
+            Face.id,
+            Face.photo_id,
+            Photo.file_path,
+            Face.top,
+            Face.right,
+            Face.bottom,
+            Face.left,
+            Face.confidence,
+            Face.cluster_confidence,
         )
+        .join(Photo, Photo.id == Face.photo_id)
+        .filter(Face.cluster_id == cluster_id)
+        .order_by(Photo.scanned_at.desc().nullslast(), Face.id.desc())
+        .all()
+    )
 
-        payload = {
-            "id": cluster.id,
-            "name": cluster.name,
-            "face_count": cluster.face_count,
-            "representative_face_id": cluster.representative_face_id,
-            "is_locked": bool(cluster.is_locked or cluster.name),
-            "faces": [
-                {
-                    "id": face.id,
-                    "photo_id": face.photo_id,
-                    "photo_path": photo.file_path,
-                    "top": face.top,
-                    "right": face.right,
-                    "bottom": face.bottom,
-                    "left": face.left,
-                    "confidence": face.confidence,
-                    "cluster_confidence": face.cluster_confidence,
-                }
-                for face, photo in faces
-            ],
-        }
-        _set_cached_json(cache_key, payload, ttl=15)
-        return payload
-    finally:
-        session.close()
+    payload = {
+        "id": cluster.id,
+        "name": cluster.name,
+        "face_count": cluster.face_count,
+        "representative_face_id": cluster.representative_face_id,
+        "is_locked": bool(cluster.is_locked or cluster.name),
+        "faces": [
+            {
+                "id": face.id,
+                "photo_id": face.photo_id,
+                "photo_path": face.file_path,
+                "top": face.top,
+                "right": face.right,
+                "bottom": face.bottom,
+                "left": face.left,
+                "confidence": face.confidence,
+                "cluster_confidence": face.cluster_confidence,
+            }
+            for face in faces
+        ],
+    }
+    body = _encode_cluster_detail(payload)
+    _set_cached_body(cache_key, body, ttl=15)
+    return _json_body_response(body)
 
 
 @app.put("/clusters/{cluster_id}/name")
-async def update_cluster_name(
+def update_cluster_name(
     cluster_id: int, name: str = Query(..., min_length=1, max_length=100)
 ):
     success = db.update_cluster_name(cluster_id, name.strip())
@@ -319,21 +579,19 @@ async def update_cluster_name(
 
 
 @app.put("/clusters/{cluster_id}/representative/{face_id}")
-async def set_representative_face(cluster_id: int, face_id: int):
-    session = db.get_session()
-    try:
-        cluster = session.query(Cluster).filter_by(id=cluster_id).first()
+def set_representative_face(
+    cluster_id: int, face_id: int, session: Session = Depends(get_db_session)
+):
+    with session.begin():
+        cluster = session.get(Cluster, cluster_id)
         if not cluster:
             raise HTTPException(status_code=404, detail="Cluster not found")
 
-        face = session.query(Face).filter_by(id=face_id, cluster_id=cluster_id).first()
-        if not face:
+        face = session.get(Face, face_id)
+        if not face or face.cluster_id != cluster_id:
             raise HTTPException(status_code=404, detail="Face not found in this cluster")
 
         cluster.representative_face_id = face_id
-        session.commit()
-    finally:
-        session.close()
 
     _invalidate_api_cache()
     return {
@@ -344,85 +602,89 @@ async def set_representative_face(cluster_id: int, face_id: int):
 
 
 @app.get("/clusters/by-name/{name}")
-async def get_clusters_by_name(name: str):
-    session = db.get_session()
-    try:
-        clusters = session.query(Cluster).filter_by(name=name).all()
-        return {
-            "name": name,
-            "count": len(clusters),
-            "clusters": [
-                {
-                    "id": cluster.id,
-                    "face_count": cluster.face_count,
-                    "representative_face_id": cluster.representative_face_id,
-                    "is_locked": bool(cluster.is_locked or cluster.name),
-                }
-                for cluster in clusters
-            ],
-        }
-    finally:
-        session.close()
+def get_clusters_by_name(name: str, session: Session = Depends(get_db_session)):
+    clusters = (
+        session.query(
+            Cluster.id,
+            Cluster.name,
+            Cluster.face_count,
+            Cluster.representative_face_id,
+            Cluster.is_locked,
+        )
+        .filter(Cluster.name == name)
+        .all()
+    )
+    return {
+        "name": name,
+        "count": len(clusters),
+        "clusters": [
+            {
+                "id": cluster.id,
+                "face_count": cluster.face_count,
+                "representative_face_id": cluster.representative_face_id,
+                "is_locked": bool(cluster.is_locked or cluster.name),
+            }
+            for cluster in clusters
+        ],
+    }
 
 
 @app.get("/photos/{photo_id}", response_model=PhotoInfo)
-def get_photo_info(photo_id: int):
+def get_photo_info(photo_id: int, session: Session = Depends(get_db_session)):
+    photo = (
+        session.query(
+            Photo.id, Photo.file_path, Photo.width, Photo.height, Photo.face_count
+        )
+        .filter(Photo.id == photo_id)
+        .first()
+    )
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return {
+        "id": photo.id,
+        "file_path": photo.file_path,
+        "width": photo.width,
+        "height": photo.height,
+        "face_count": photo.face_count,
+    }
+
+
+@app.get("/photos/{photo_id}/image")
+def get_photo_image(photo_id: int, request: Request):
     session = db.get_session()
     try:
-        photo = session.query(Photo).filter_by(id=photo_id).first()
-        if not photo:
-            raise HTTPException(status_code=404, detail="Photo not found")
-        return {
-            "id": photo.id,
-            "file_path": photo.file_path,
-            "width": photo.width,
-            "height": photo.height,
-            "face_count": photo.face_count,
-        }
+        file_path = session.query(Photo.file_path).filter(Photo.id == photo_id).scalar()
     finally:
         session.close()
 
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="Photo file not found on disk")
 
-@app.get("/photos/{photo_id}/image")
-def get_photo_image(photo_id: int):
-    session = db.get_session()
-    try:
-        from PIL import Image
+    validators = _file_validators(f"photo-{photo_id}", file_path)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=_image_headers(validators))
 
-        photo = session.query(Photo).filter_by(id=photo_id).first()
-        if not photo:
-            raise HTTPException(status_code=404, detail="Photo not found")
-        if not os.path.exists(photo.file_path):
-            raise HTTPException(status_code=404, detail="Photo file not found on disk")
+    extension = file_path.lower().split(".")[-1]
+    if extension in {"heic", "heif"}:
+        try:
+            cache_file = build_photo_jpeg_cache(photo_id, file_path)
+            return _file_response(
+                cache_file, _image_headers(validators), media_type="image/jpeg"
+            )
+        except Exception as exc:
+            logger.error("Failed to convert HEIC image {}: {}", file_path, exc)
+            return Response(content=PLACEHOLDER_PHOTO_JPEG, media_type="image/jpeg")
 
-        extension = photo.file_path.lower().split(".")[-1]
-        if extension in {"heic", "heif"}:
-            try:
-                image = Image.open(photo.file_path)
-                output = io.BytesIO()
-                if image.mode in {"RGBA", "LA", "P"}:
-                    image = image.convert("RGB")
-                image.save(output, format="JPEG", quality=90)
-                output.seek(0)
-                return StreamingResponse(output, media_type="image/jpeg")
-            except Exception as exc:
-                logger.error("Failed to convert HEIC image {}: {}", photo.file_path, exc)
-                placeholder = Image.new("RGB", (800, 600), color=(128, 128, 128))
-                output = io.BytesIO()
-                placeholder.save(output, format="JPEG")
-                output.seek(0)
-                return StreamingResponse(output, media_type="image/jpeg")
-
-        return FileResponse(photo.file_path)
-    finally:
-        session.close()
+    return _file_response(file_path, _image_headers(validators))
 
 
 @app.post("/photos/{photo_id}/reveal")
 def reveal_photo_in_finder(photo_id: int):
     session = db.get_session()
     try:
-        photo = session.query(Photo).filter_by(id=photo_id).first()
+        photo = session.get(Photo, photo_id)
         if not photo:
             raise HTTPException(status_code=404, detail="Photo not found")
         if not os.path.exists(photo.file_path):
@@ -445,95 +707,130 @@ def reveal_photo_in_finder(photo_id: int):
 
 
 @app.get("/faces/{face_id}", response_model=FaceInfo)
-def get_face_info(face_id: int):
-    session = db.get_session()
-    try:
-        face = session.query(Face).filter_by(id=face_id).first()
-        if not face:
-            raise HTTPException(status_code=404, detail="Face not found")
-        return {
-            "id": face.id,
-            "photo_id": face.photo_id,
-            "top": face.top,
-            "right": face.right,
-            "bottom": face.bottom,
-            "left": face.left,
-            "confidence": face.confidence,
-            "cluster_id": face.cluster_id,
-            "cluster_confidence": face.cluster_confidence,
-        }
-    finally:
-        session.close()
+def get_face_info(face_id: int, session: Session = Depends(get_db_session)):
+    face = (
+        session.query(
+            Face.id,
+            Face.photo_id,
+            Face.top,
+            Face.right,
+            Face.bottom,
+            Face.left,
+            Face.confidence,
+            Face.cluster_id,
+            Face.cluster_confidence,
+        )
+        .filter(Face.id == face_id)
+        .first()
+    )
+    if not face:
+        raise HTTPException(status_code=404, detail="Face not found")
+    return {
+        "id": face.id,
+        "photo_id": face.photo_id,
+        "top": face.top,
+        "right": face.right,
+        "bottom": face.bottom,
+        "left": face.left,
+        "confidence": face.confidence,
+        "cluster_id": face.cluster_id,
+        "cluster_confidence": face.cluster_confidence,
+    }
 
 
 @app.get("/faces/{face_id}/crop")
 def get_face_crop(
     face_id: int,
+    request: Request,
     thumbnail: bool = Query(True, description="Generate a thumbnail for quick loading"),
 ):
     cache_file = get_face_cache_path(face_id, thumbnail=thumbnail)
     if cache_file.exists():
-        return FileResponse(cache_file, media_type="image/jpeg")
+        return _face_crop_response(request, cache_file)
 
+    # Only face rows come from the database; the session is released before
+    # the source photo is decoded.
     session = db.get_session()
     try:
-        from PIL import Image
-
-        face = session.query(Face).filter_by(id=face_id).first()
-        if not face:
-            raise HTTPException(status_code=404, detail="Face not found")
+        face = (
+            session.query(
+                Face.id,
+                Face.photo_id,
+                Face.top,
+                Face.right,
+                Face.bottom,
+                Face.left,
+                Photo.file_path,
+            )
+            .outerjoin(Photo, Photo.id == Face.photo_id)
+            .filter(Face.id == face_id)
+            .first()
+        )
+        sibling_faces = []
+        if face and thumbnail:
+            sibling_rows = (
+                session.query(Face.id, Face.top, Face.right, Face.bottom, Face.left)
+                .filter(Face.photo_id == face.photo_id)
+                .all()
+            )
+            sibling_faces = [
+                {
+                    "id": row.id,
+                    "top": row.top,
+                    "right": row.right,
+                    "bottom": row.bottom,
+                    "left": row.left,
+                }
+                for row in sibling_rows
+            ]
+    finally:
+        session.close()
 
-        photo = session.query(Photo).filter_by(id=face.photo_id).first()
-        if not photo or not os.path.exists(photo.file_path):
-            raise HTTPException(status_code=404, detail="Photo file not found")
+    if not face:
+        raise HTTPException(status_code=404, detail="Face not found")
+    if not face.file_path or not os.path.exists(face.file_path):
+        raise HTTPException(status_code=404, detail="Photo file not found")
 
-        try:
+    try:
+        if sibling_faces:
+            # Decode the photo once and cache every face in it; the cluster
+            # view usually asks for the other faces soon after.
+            warm_face_crop_cache(face.file_path, sibling_faces, thumbnail=True)
+        else:
             build_face_crop_cache(
                 face_id=face.id,
-                photo_path=photo.file_path,
+                photo_path=face.file_path,
                 bounds=(face.top, face.right, face.bottom, face.left),
                 thumbnail=thumbnail,
             )
-            return FileResponse(cache_file, media_type="image/jpeg")
-        except Exception as exc:
-            logger.error("Failed to crop face {}: {}", face_id, exc)
-            placeholder = Image.new(
-                "RGB",
-                THUMBNAIL_SIZE if thumbnail else (200, 200),
-                color=(128, 128, 128),
-            )
-            placeholder.save(cache_file, format="JPEG")
-            return FileResponse(cache_file, media_type="image/jpeg")
-    finally:
-        session.close()
+        return _face_crop_response(request, cache_file)
+    except Exception as exc:
+        logger.error("Failed to crop face {}: {}", face_id, exc)
+        cache_file.write_bytes(PLACEHOLDER_THUMBNAIL_JPEG if thumbnail else PLACEHOLDER_FACE_JPEG)
+        return FileResponse(cache_file, media_type="image/jpeg")
 
 
 @app.post("/faces/{face_id}/exclude")
-async def exclude_face(face_id: int):
-    session = db.get_session()
+def exclude_face(face_id: int, session: Session = Depends(get_db_session)):
     old_cluster_id = None
-    try:
-        face = session.query(Face).filter_by(id=face_id).first()
+    with session.begin():
+        face = session.get(Face, face_id)
         if not face:
             raise HTTPException(status_code=404, detail="Face not found")
 
-        correction = session.query(FaceCorrection).filter_by(face_id=face_id).first()
-        if not correction:
-            correction = FaceCorrection(face_id=face_id)
-            session.add(correction)
-
         old_cluster_id = face.cluster_id
-        correction.is_excluded = True
-        correction.person_name = None
-        correction.manual_cluster_id = None
-        correction.excluded_from_cluster_id = old_cluster_id
+        _upsert_face_correction(
+            session,
+            face_id,
+            is_excluded=True,
+            person_name=None,
+            manual_cluster_id=None,
+            excluded_from_cluster_id=old_cluster_id,
+        )
 
         face.cluster_id = None
         face.needs_clustering = False
         face.cluster_confidence = 1.0
-        session.commit()
-    finally:
-        session.close()
 
     if old_cluster_id:
         db.update_cluster_counts([old_cluster_id])
@@ -547,22 +844,22 @@ async def exclude_face(face_id: int):
 
 
 @app.post("/faces/{face_id}/assign")
-async def assign_face_to_person(
+def assign_face_to_person(
     face_id: int,
     person_name: str = Query(..., min_length=1),
     target_cluster_id: Optional[int] = None,
+    session: Session = Depends(get_db_session),
 ):
-    session = db.get_session()
     old_cluster_id = None
     target_cluster = None
     person_name = person_name.strip()
-    try:
-        face = session.query(Face).filter_by(id=face_id).first()
+    with session.begin():
+        face = session.get(Face, face_id)
         if not face:
             raise HTTPException(status_code=404, detail="Face not found")
 
         if target_cluster_id is not None:
-            target_cluster = session.query(Cluster).filter_by(id=target_cluster_id).first()
+            target_cluster = session.get(Cluster, target_cluster_id)
         if not target_cluster:
             target_cluster = (
                 session.query(Cluster)
@@ -575,14 +872,13 @@ async def assign_face_to_person(
             session.add(target_cluster)
             session.flush()
 
-        correction = session.query(FaceCorrection).filter_by(face_id=face_id).first()
-        if not correction:
-            correction = FaceCorrection(face_id=face_id)
-            session.add(correction)
-
-        correction.person_name = person_name
-        correction.manual_cluster_id = target_cluster.id
-        correction.is_excluded = False
+        _upsert_face_correction(
+            session,
+            face_id,
+            person_name=person_name,
+            manual_cluster_id=target_cluster.id,
+            is_excluded=False,
+        )
 
         target_cluster.name = person_name
         target_cluster.is_locked = True
@@ -592,10 +888,6 @@ async def assign_face_to_person(
         face.needs_clustering = False
         face.cluster_confidence = 1.0
 
-        session.commit()
-    finally:
-        session.close()
-
     update_ids = [cluster_id for cluster_id in {old_cluster_id, target_cluster.id} if cluster_id]
     if update_ids:
         db.update_cluster_counts(update_ids)
@@ -610,12 +902,11 @@ async def assign_face_to_person(
 
 
 @app.delete("/faces/{face_id}/correction")
-async def remove_correction(face_id: int):
-    session = db.get_session()
+def remove_correction(face_id: int, session: Session = Depends(get_db_session)):
     old_cluster_id = None
     removed = False
-    try:
-        face = session.query(Face).filter_by(id=face_id).first()
+    with session.begin():
+        face = session.get(Face, face_id)
         if not face:
             raise HTTPException(status_code=404, detail="Face not found")
 
@@ -628,9 +919,6 @@ async def remove_correction(face_id: int):
         face.cluster_id = None
         face.needs_clustering = True
         face.cluster_confidence = None
-        session.commit()
-    finally:
-        session.close()
 
     if old_cluster_id:
         db.update_cluster_counts([old_cluster_id])
@@ -643,7 +931,7 @@ async def remove_correction(face_id: int):
 
 
 @app.get("/health")
-async def health_check():
+def health_check():
     return {
         "status": "healthy",
         "database": "connected",
@@ -653,9 +941,7 @@ async def health_check():
 
 
 @app.post("/cache/clear")
-async def clear_cache():
-    import shutil
-
+def clear_cache():
     try:
         file_count = len(list(CACHE_DIR.glob("*.jpg"))) if CACHE_DIR.exists() else 0
         if CACHE_DIR.exists():
@@ -673,7 +959,7 @@ async def clear_cache():
 
 
 @app.get("/cache/stats")
-async def get_cache_stats():
+def get_cache_stats():
     try:
         files = list(CACHE_DIR.glob("*.jpg")) if CACHE_DIR.exists() else []
         total_size = sum(file_path.stat().st_size for file_path in files)
@@ -681,6 +967,7 @@ async def get_cache_stats():
             "cache_dir": str(CACHE_DIR),
             "file_count": len(files),
             "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "max_size_mb": round(CACHE_MAX_BYTES / (1024 * 1024), 2) if CACHE_MAX_BYTES else None,
             "thumbnail_size": f"{THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}",
             "backend": cache.backend_name(),
         }
@@ -11,11 +11,10 @@ from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from backend.clustering_service import ClusteringService
 from backend.database import DatabaseManager
 from backend.redis_cache import RedisCache
+from backend.sync_service import prebuild_face_crops
 
 load_dotenv()
 
@@ -26,7 +25,9 @@ def cluster_faces(force_rebuild: bool = False) -> dict:
     db = DatabaseManager()
     cache = RedisCache()
     service = ClusteringService(db=db, cache=cache)
-    return service.run(force_rebuild=force_rebuild)
+    summary = service.run(force_rebuild=force_rebuild)
+    summary["prebuilt_face_crops"] = prebuild_face_crops(db, use_processes=True)
+    return summary
 
 
 if __name__ == "__main__":
@@ -50,12 +51,19 @@ if __name__ == "__main__":
         default=None,
         help="Raw Euclidean distance threshold for the coarse DBSCAN pass",
     )
+    parser.add_argument(
+        "--gpu",
+        action="store_true",
+        help="Run the DBSCAN pass on a CUDA GPU with cuML when it is installed",
+    )
     args = parser.parse_args()
 
     if args.min_size is not None:
         os.environ["MIN_CLUSTER_SIZE"] = str(args.min_size)
     if args.eps is not None:
         os.environ["CLUSTER_DBSCAN_EPSILON"] = str(args.eps)
+    if args.gpu:
+        os.environ["CLUSTER_USE_GPU"] = "true"
 
     try:
         summary = cluster_faces(force_rebuild=args.rebuild)
@@ -70,6 +78,7 @@ if __name__ == "__main__":
                         f"Clustered into new groups: [yellow]{summary['clustered_new_faces']}[/yellow]",
                         f"Created clusters: [yellow]{summary['created_clusters']}[/yellow]",
                         f"Left unclustered: [yellow]{summary['left_unclustered']}[/yellow]",
+                        f"Prebuilt thumbnails: [yellow]{summary['prebuilt_face_crops']}[/yellow]",
                     ]
                 ),
                 title="Face Clustering",
@@ -11,10 +11,41 @@ from typing import Iterable, Optional
 import numpy as np
 from loguru import logger
 from sklearn.cluster import DBSCAN
-from sqlalchemy import or_
+from sqlalchemy import insert, or_, text
 
-from backend.database import Cluster, DatabaseManager, Face, FaceCorrection
-from backend.redis_cache import RedisCache
+from backend.database import (
+    FACE_EMBEDDING_BYTES,
+    Cluster,
+    DatabaseManager,
+    Face,
+    FaceCorrection,
+    stack_embeddings,
+)
+from backend.redis_cache import RedisCache, TTLLRUCache
+
+try:
+    from cuml.cluster import DBSCAN as GPU_DBSCAN
+
+    GPU_IMPORT_ERROR = None
+except ImportError as exc:  # pragma: no cover - RAPIDS is only present on CUDA hosts
+    GPU_DBSCAN = None
+    GPU_IMPORT_ERROR = exc
+
+
+# Upper bound on candidate x prototype distances held in memory at once.
+ASSIGN_BLOCK_ELEMENTS = 4_000_000
+
+# Prototype centroids kept between runs, keyed by the exact face ids they average.
+PROTOTYPE_CACHE_SIZE = 8192
+PROTOTYPE_CACHE_TTL = 3600
+# Clusters per embedding query when filling prototype cache misses.
+PROTOTYPE_QUERY_CLUSTERS = 500
+
+# One prepared statement for every cluster assignment write; bound per face via executemany.
+FACE_ASSIGNMENT_UPDATE = text(
+    "UPDATE faces SET cluster_id = :cluster_id, needs_clustering = :needs_clustering, "
+    "cluster_confidence = :cluster_confidence WHERE id = :id"
+)
 
 
 @dataclass
@@ -22,6 +53,7 @@ class FaceVector:
     id: int
     photo_id: int
     embedding: np.ndarray
+    needs_clustering: bool = True
 
 
 @dataclass
@@ -39,6 +71,9 @@ class ClusteringService:
     def __init__(self, db: DatabaseManager, cache: Optional[RedisCache] = None) -> None:
         self.db = db
         self.cache = cache
+        self.prototype_cache = TTLLRUCache(
+            maxsize=PROTOTYPE_CACHE_SIZE, ttl=PROTOTYPE_CACHE_TTL
+        )
         self.algorithm_version = os.getenv("CLUSTERING_ALGORITHM_VERSION", "3")
         self.min_cluster_size = int(os.getenv("MIN_CLUSTER_SIZE", "2"))
         legacy_cluster_eps = float(os.getenv("CLUSTER_EPSILON", "0.25"))
@@ -71,6 +106,13 @@ class ClusteringService:
             )
         )
         self.assignment_margin = float(os.getenv("CLUSTER_ASSIGN_MARGIN", "0.04"))
+        self.use_gpu = os.getenv("CLUSTER_USE_GPU", "false").lower() in {"1", "true", "yes"}
+        if self.use_gpu and GPU_DBSCAN is None:
+            logger.warning(
+                "CLUSTER_USE_GPU is set but cuML is unavailable, using scikit-learn: {}",
+                GPU_IMPORT_ERROR,
+            )
+            self.use_gpu = False
 
     def needs_rebuild(self) -> bool:
         version = self.db.get_setting("clustering_algorithm_version")
@@ -101,6 +143,14 @@ class ClusteringService:
                 session, candidates, prototypes
             )
 
+            skipped_settled_ids: set[int] = set()
+            if not rebuild:
+                limited = self._limit_to_new_neighbourhoods(remaining)
+                # Still unclustered, just not worth re-running DBSCAN on.
+                skipped_settled_ids = {face.id for face in remaining} - {
+                    face.id for face in limited
+                }
+                remaining = limited
             clustered_new, created_clusters, updated_cluster_ids = self._cluster_remaining(
                 session, remaining, prototypes
             )
@@ -153,7 +203,8 @@ class ClusteringService:
             "clustered_new_faces": len(clustered_new),
             "created_clusters": len(created_clusters),
             "updated_clusters": len(updated_cluster_ids),
-            "left_unclustered": len(unresolved_ids),
+            "left_unclustered": len(unresolved_ids) + len(skipped_settled_ids),
+            "skipped_settled_faces": len(skipped_settled_ids),
         }
         logger.info("Clustering finished: {}", result)
         return result
@@ -206,18 +257,40 @@ class ClusteringService:
     def _apply_corrections(self, session, correction_map: dict[int, FaceCorrection]) -> tuple[int, set[int]]:
         excluded_count = 0
         affected_cluster_ids: set[int] = set()
+        face_updates: list[dict] = []
+
+        face_cluster_ids = {}
+        cluster_ids = {
+            correction.manual_cluster_id
+            for correction in correction_map.values()
+            if correction.manual_cluster_id is not None
+        }
+        if correction_map:
+            face_cluster_ids = dict(
+                session.query(Face.id, Face.cluster_id)
+                .filter(Face.id.in_(list(correction_map)))
+                .all()
+            )
+        if cluster_ids:
+            # Warm the identity map so session.get below does not hit the database per face.
+            session.query(Cluster).filter(Cluster.id.in_(list(cluster_ids))).all()
 
         for correction in correction_map.values():
-            face = session.query(Face).filter_by(id=correction.face_id).first()
-            if not face:
+            if correction.face_id not in face_cluster_ids:
                 continue
+            current_cluster_id = face_cluster_ids[correction.face_id]
 
             if correction.is_excluded:
-                if correction.excluded_from_cluster_id is None and face.cluster_id is not None:
-                    correction.excluded_from_cluster_id = face.cluster_id
-                face.cluster_id = None
-                face.needs_clustering = False
-                face.cluster_confidence = 1.0
+                if correction.excluded_from_cluster_id is None and current_cluster_id is not None:
+                    correction.excluded_from_cluster_id = current_cluster_id
+                face_updates.append(
+                    {
+                        "id": correction.face_id,
+                        "cluster_id": None,
+                        "needs_clustering": False,
+                        "cluster_confidence": 1.0,
+                    }
+                )
                 excluded_count += 1
                 continue
 
@@ -226,7 +299,7 @@ class ClusteringService:
 
             cluster = None
             if correction.manual_cluster_id is not None:
-                cluster = session.query(Cluster).filter_by(id=correction.manual_cluster_id).first()
+                cluster = session.get(Cluster, correction.manual_cluster_id)
             if not cluster and correction.person_name:
                 cluster = (
                     session.query(Cluster)
@@ -248,11 +321,17 @@ class ClusteringService:
             cluster.is_locked = True
             correction.manual_cluster_id = cluster.id
 
-            face.cluster_id = cluster.id
-            face.needs_clustering = False
-            face.cluster_confidence = 1.0
+            face_updates.append(
+                {
+                    "id": correction.face_id,
+                    "cluster_id": cluster.id,
+                    "needs_clustering": False,
+                    "cluster_confidence": 1.0,
+                }
+            )
             affected_cluster_ids.add(cluster.id)
 
+        self._write_face_updates(session, face_updates)
         session.flush()
         return excluded_count, affected_cluster_ids
 
@@ -262,49 +341,58 @@ class ClusteringService:
         rebuild: bool,
         correction_map: dict[int, FaceCorrection],
     ) -> list[FaceVector]:
-        if rebuild:
-            faces = session.query(Face).all()
-        else:
-            faces = (
-                session.query(Face)
-                .filter(or_(Face.needs_clustering.is_(True), Face.cluster_id.is_(None)))
-                .all()
-            )
+        query = session.query(
+            Face.id, Face.photo_id, FACE_EMBEDDING_BYTES, Face.needs_clustering
+        )
+        if not rebuild:
+            query = query.filter(or_(Face.needs_clustering.is_(True), Face.cluster_id.is_(None)))
 
-        candidates: list[FaceVector] = []
-        for face in faces:
-            correction = correction_map.get(face.id)
+        rows = []
+        for row in query.order_by(Face.id).all():
+            correction = correction_map.get(row.id)
             if correction and correction.is_excluded:
                 continue
             if correction and (correction.manual_cluster_id or correction.person_name):
                 continue
-            candidates.append(
-                FaceVector(
-                    id=face.id,
-                    photo_id=face.photo_id,
-                    embedding=np.array(face.embedding, dtype=float),
-                )
+            rows.append(row)
+        if not rows:
+            return []
+
+        # One contiguous matrix; each FaceVector holds a row view into it.
+        matrix = stack_embeddings([row.embedding for row in rows]).astype(float)
+        return [
+            FaceVector(
+                id=row.id,
+                photo_id=row.photo_id,
+                embedding=matrix[index],
+                needs_clustering=bool(row.needs_clustering),
             )
-        return candidates
+            for index, row in enumerate(rows)
+        ]
 
     def _build_prototypes(
         self, session, excluded_face_ids: Iterable[int]
     ) -> list[ClusterPrototype]:
-        excluded_face_ids = list(excluded_face_ids)
+        excluded_face_ids = set(excluded_face_ids)
         clusters = session.query(Cluster).all()
-        prototypes: list[ClusterPrototype] = []
 
+        face_ids_by_cluster: dict[int, list[int]] = {}
+        for face_id, cluster_id in (
+            session.query(Face.id, Face.cluster_id)
+            .filter(Face.cluster_id.isnot(None))
+            .order_by(Face.id)
+        ):
+            if face_id not in excluded_face_ids:
+                face_ids_by_cluster.setdefault(cluster_id, []).append(face_id)
+
+        centroids = self._cached_centroids(session, face_ids_by_cluster, excluded_face_ids)
+        prototypes: list[ClusterPrototype] = []
         for cluster in clusters:
-            query = session.query(Face).filter(Face.cluster_id == cluster.id)
-            if excluded_face_ids:
-                query = query.filter(~Face.id.in_(excluded_face_ids))
-            faces = query.all()
-
-            if faces:
-                matrix = np.array([face.embedding for face in faces], dtype=float)
-                centroid = self._centroid(matrix)
-                face_count = len(faces)
-            elif cluster.centroid:
+            face_ids = face_ids_by_cluster.get(cluster.id)
+            if face_ids:
+                centroid = centroids[cluster.id]
+                face_count = len(face_ids)
+            elif cluster.centroid is not None and cluster.centroid.size:
                 centroid = np.array(cluster.centroid, dtype=float)
                 face_count = cluster.face_count or 0
             else:
@@ -322,6 +410,61 @@ class ClusteringService:
 
         return prototypes
 
+    def _cached_centroids(
+        self,
+        session,
+        face_ids_by_cluster: dict[int, list[int]],
+        excluded_face_ids: set[int],
+    ) -> dict[int, np.ndarray]:
+        """Centroid per cluster, reading embeddings only for clusters whose faces changed.
+
+        Faces are immutable once stored, so a cluster's centroid is fully determined by
+        its face ids (plus the database's face generation, which guards against id
+        reuse after deletes from any process). Keys hold a hash of the ids rather than
+        the ids themselves. Cached arrays are read-only; prototypes replace, never
+        mutate, their centroid.
+        """
+
+        generation = self.db.get_face_generation(session)
+        centroids: dict[int, np.ndarray] = {}
+        keys: dict[int, tuple] = {}
+        for cluster_id, face_ids in face_ids_by_cluster.items():
+            key = (cluster_id, generation, len(face_ids), hash(tuple(face_ids)))
+            cached = self.prototype_cache.get(key)
+            if cached is None:
+                keys[cluster_id] = key
+            else:
+                centroids[cluster_id] = cached
+
+        missing = list(keys)
+        for start in range(0, len(missing), PROTOTYPE_QUERY_CLUSTERS):
+            rows = [
+                row
+                for row in (
+                    session.query(Face.id, Face.cluster_id, FACE_EMBEDDING_BYTES)
+                    .filter(Face.cluster_id.in_(missing[start:start + PROTOTYPE_QUERY_CLUSTERS]))
+                    .order_by(Face.id)
+                    .all()
+                )
+                if row.id not in excluded_face_ids
+            ]
+            matrix = stack_embeddings([row.embedding for row in rows]).astype(float)
+            indices_by_cluster: dict[int, list[int]] = {}
+            for index, row in enumerate(rows):
+                indices_by_cluster.setdefault(row.cluster_id, []).append(index)
+            for cluster_id, indices in indices_by_cluster.items():
+                centroid = self._centroid(matrix[indices])
+                centroid.setflags(write=False)
+                self.prototype_cache.put(keys[cluster_id], centroid)
+                centroids[cluster_id] = centroid
+
+        logger.debug(
+            "Prototype centroids: {} cached, {} recomputed",
+            len(face_ids_by_cluster) - len(missing),
+            len(missing),
+        )
+        return centroids
+
     def _assign_candidates(
         self,
         session,
@@ -337,51 +480,119 @@ class ClusteringService:
 
         assigned: dict[int, int] = {}
         remaining: list[FaceVector] = []
-
-        for face in candidates:
-            distances = np.linalg.norm(prototype_centroids - face.embedding, axis=1)
-            order = np.argsort(distances)
-            nearest_index = int(order[0])
-            nearest_cluster_id = prototype_ids[nearest_index]
-            nearest_distance = float(distances[nearest_index])
-            threshold = (
-                self.locked_assign_threshold
-                if prototype_lookup[nearest_cluster_id].is_locked
-                else self.assign_threshold
+        face_updates: list[dict] = []
+
+        # Distances are computed a block of candidates at a time with one
+        # matrix product per block, keeping the block * prototypes matrix small.
+        block_size = max(1, ASSIGN_BLOCK_ELEMENTS // len(prototypes))
+        for start in range(0, len(candidates), block_size):
+            block = candidates[start : start + block_size]
+            distances = self._pairwise_distances(
+                np.stack([face.embedding for face in block]), prototype_centroids
             )
-            second_distance = (
-                float(distances[int(order[1])]) if len(order) > 1 else None
+            nearest_indices = distances.argmin(axis=1)
+            nearest_distances = distances[np.arange(len(block)), nearest_indices]
+            second_distances = (
+                np.partition(distances, 1, axis=1)[:, 1] if len(prototypes) > 1 else None
             )
 
-            confident = nearest_distance <= threshold
-            well_separated = (
-                second_distance is None
-                or (second_distance - nearest_distance) >= self.assignment_margin
-            )
+            for row, face in enumerate(block):
+                nearest_cluster_id = prototype_ids[int(nearest_indices[row])]
+                nearest_distance = float(nearest_distances[row])
+                threshold = (
+                    self.locked_assign_threshold
+                    if prototype_lookup[nearest_cluster_id].is_locked
+                    else self.assign_threshold
+                )
+                second_distance = (
+                    float(second_distances[row]) if second_distances is not None else None
+                )
 
-            if confident and well_separated:
-                assigned[face.id] = nearest_cluster_id
-                confidence = round(
-                    max(0.0, 1.0 - (nearest_distance / max(threshold, 1e-6))),
-                    4,
+                confident = nearest_distance <= threshold
+                well_separated = (
+                    second_distance is None
+                    or (second_distance - nearest_distance) >= self.assignment_margin
                 )
-                (
-                    session.query(Face)
-                    .filter_by(id=face.id)
-                    .update(
+
+                if confident and well_separated:
+                    assigned[face.id] = nearest_cluster_id
+                    confidence = round(
+                        max(0.0, 1.0 - (nearest_distance / max(threshold, 1e-6))),
+                        4,
+                    )
+                    face_updates.append(
                         {
+                            "id": face.id,
                             "cluster_id": nearest_cluster_id,
                             "needs_clustering": False,
                             "cluster_confidence": confidence,
                         }
                     )
-                )
-            else:
-                remaining.append(face)
+                else:
+                    remaining.append(face)
 
+        self._write_face_updates(session, face_updates)
         session.flush()
         return assigned, remaining
 
+    def _limit_to_new_neighbourhoods(self, remaining: list[FaceVector]) -> list[FaceVector]:
+        """Drop settled unclustered faces that no new face can reach.
+
+        Faces left unclustered by an earlier run only change outcome if the
+        DBSCAN eps-graph connects them to a face that still needs clustering,
+        so everything outside those connected components is skipped instead
+        of being re-clustered on every incremental run.
+        """
+
+        fresh = [face for face in remaining if face.needs_clustering]
+        settled = [face for face in remaining if not face.needs_clustering]
+        if not fresh:
+            return []
+        if not settled:
+            return remaining
+
+        settled_matrix = np.stack([face.embedding for face in settled])
+        reached = np.zeros(len(settled), dtype=bool)
+        frontier = np.stack([face.embedding for face in fresh])
+        while len(frontier):
+            unreached = np.flatnonzero(~reached)
+            if not len(unreached):
+                break
+            targets = settled_matrix[unreached]
+            hits = np.zeros(len(unreached), dtype=bool)
+            block_size = max(1, ASSIGN_BLOCK_ELEMENTS // len(unreached))
+            for start in range(0, len(frontier), block_size):
+                distances = self._pairwise_distances(frontier[start : start + block_size], targets)
+                hits |= (distances <= self.cluster_eps).any(axis=0)
+            newly_reached = unreached[hits]
+            reached[newly_reached] = True
+            frontier = settled_matrix[newly_reached]
+
+        reached_ids = {settled[index].id for index in np.flatnonzero(reached)}
+        return [face for face in remaining if face.needs_clustering or face.id in reached_ids]
+
+    def _dbscan_labels(self, matrix: np.ndarray) -> np.ndarray:
+        min_samples = max(self.min_cluster_size, 2)
+        if self.use_gpu:
+            try:
+                # The stacked matrix is C-contiguous: one host-to-device copy.
+                return np.asarray(
+                    GPU_DBSCAN(
+                        eps=self.cluster_eps,
+                        min_samples=min_samples,
+                        metric="euclidean",
+                        output_type="numpy",
+                    ).fit_predict(matrix)
+                )
+            except Exception as exc:
+                logger.warning("GPU DBSCAN failed, falling back to scikit-learn: {}", exc)
+        return DBSCAN(
+            eps=self.cluster_eps,
+            min_samples=min_samples,
+            metric="euclidean",
+            n_jobs=-1,
+        ).fit_predict(matrix)
+
     def _cluster_remaining(
         self,
         session,
@@ -399,12 +610,7 @@ class ClusteringService:
             return clustered_faces, created_clusters, updated_cluster_ids
 
         matrix = np.stack([face.embedding for face in remaining])
-        labels = DBSCAN(
-            eps=self.cluster_eps,
-            min_samples=max(self.min_cluster_size, 2),
-            metric="euclidean",
-            n_jobs=-1,
-        ).fit_predict(matrix)
+        labels = self._dbscan_labels(matrix)
 
         grouped: dict[int, list[FaceVector]] = {}
         for face, label in zip(remaining, labels):
@@ -413,6 +619,9 @@ class ClusteringService:
             grouped.setdefault(int(label), []).append(face)
 
         dynamic_prototypes = list(prototypes)
+        # New clusters get negative placeholder ids until they are inserted in one batch.
+        new_cluster_rows: list[dict] = []
+        face_updates: list[dict] = []
 
         for faces in grouped.values():
             refined_groups = self._refine_cluster_group(faces)
@@ -422,18 +631,17 @@ class ClusteringService:
                 target_cluster_id = self._match_existing_cluster(centroid, dynamic_prototypes)
 
                 if target_cluster_id is None:
-                    cluster = Cluster(
-                        last_clustered_at=None,
-                        centroid=centroid.tolist(),
-                        is_locked=False,
+                    new_cluster_rows.append(
+                        {
+                            "last_clustered_at": None,
+                            "centroid": centroid,
+                            "is_locked": False,
+                        }
                     )
-                    session.add(cluster)
-                    session.flush()
-                    target_cluster_id = cluster.id
-                    created_clusters.append(cluster.id)
+                    target_cluster_id = -len(new_cluster_rows)
                     dynamic_prototypes.append(
                         ClusterPrototype(
-                            id=cluster.id,
+                            id=target_cluster_id,
                             centroid=centroid,
                             is_locked=False,
                             face_count=len(refined_faces),
@@ -452,24 +660,52 @@ class ClusteringService:
                     max(0.0, 1.0 - (float(np.mean(distances)) / max(self.refine_eps, 1e-6))),
                     4,
                 )
-                face_ids = [face.id for face in refined_faces]
-                (
-                    session.query(Face)
-                    .filter(Face.id.in_(face_ids))
-                    .update(
+                for face in refined_faces:
+                    face_updates.append(
                         {
+                            "id": face.id,
                             "cluster_id": target_cluster_id,
                             "needs_clustering": False,
                             "cluster_confidence": confidence,
-                        },
-                        synchronize_session=False,
+                        }
                     )
+                    clustered_faces.add(face.id)
+
+        if new_cluster_rows:
+            created_clusters = list(
+                session.scalars(
+                    insert(Cluster).returning(Cluster.id, sort_by_parameter_order=True),
+                    new_cluster_rows,
                 )
-                clustered_faces.update(face_ids)
+            )
+            real_ids = {
+                -(index + 1): cluster_id for index, cluster_id in enumerate(created_clusters)
+            }
+            for face_update in face_updates:
+                face_update["cluster_id"] = real_ids.get(
+                    face_update["cluster_id"], face_update["cluster_id"]
+                )
+            updated_cluster_ids = {
+                real_ids.get(cluster_id, cluster_id) for cluster_id in updated_cluster_ids
+            }
+        self._write_face_updates(session, face_updates)
 
         session.flush()
         return clustered_faces, created_clusters, updated_cluster_ids
 
+    @staticmethod
+    def _write_face_updates(session, face_updates: list[dict]) -> None:
+        """Apply cluster assignments as a single executemany on the session's connection.
+
+        Skips the ORM bulk-update machinery; pending ORM changes are flushed first so
+        the raw statement runs after them in the same transaction.
+        """
+
+        if not face_updates:
+            return
+        session.flush()
+        session.connection().execute(FACE_ASSIGNMENT_UPDATE, face_updates)
+
     def _match_existing_cluster(
         self, centroid: np.ndarray, prototypes: list[ClusterPrototype]
     ) -> Optional[int]:
@@ -498,6 +734,18 @@ class ClusteringService:
     def _euclidean_distance(left: np.ndarray, right: np.ndarray) -> float:
         return float(np.linalg.norm(left - right))
 
+    @staticmethod
+    def _pairwise_distances(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Euclidean distances between every row of ``left`` and ``right`` via BLAS."""
+
+        squared = (
+            np.einsum("ij,ij->i", left, left)[:, None]
+            + np.einsum("ij,ij->i", right, right)[None, :]
+            - 2.0 * (left @ right.T)
+        )
+        np.maximum(squared, 0.0, out=squared)
+        return np.sqrt(squared, out=squared)
+
     def _refine_cluster_group(self, faces: list[FaceVector]) -> list[list[FaceVector]]:
         if len(faces) < max(self.min_cluster_size, 2):
             return []
@@ -505,43 +753,45 @@ class ClusteringService:
         matrix = np.stack([face.embedding for face in faces])
         centroid = self._centroid(matrix)
         order = np.argsort(np.linalg.norm(matrix - centroid, axis=1))
-        draft_clusters: list[dict[str, object]] = []
+
+        # Draft membership is tracked per face so that the complete-linkage
+        # check for every draft is a single vectorised pass over the members.
+        draft_of = np.full(len(faces), -1, dtype=np.int64)
+        draft_indices: list[list[int]] = []
+        draft_centroids = np.empty_like(matrix)
 
         for face_index in order:
+            face_index = int(face_index)
             vector = matrix[face_index]
+            draft_count = len(draft_indices)
             best_index: Optional[int] = None
-            best_distance: Optional[float] = None
-
-            for cluster_index, draft in enumerate(draft_clusters):
-                member_indices = draft["indices"]
-                member_matrix = matrix[member_indices]
-                distances = np.linalg.norm(member_matrix - vector, axis=1)
-                if float(distances.max()) > self.refine_eps:
-                    continue
 
-                centroid_distance = self._euclidean_distance(draft["centroid"], vector)
-                if best_index is None or centroid_distance < best_distance:
-                    best_index = cluster_index
-                    best_distance = centroid_distance
+            if draft_count:
+                assigned = np.flatnonzero(draft_of >= 0)
+                member_distances = np.linalg.norm(matrix[assigned] - vector, axis=1)
+                max_distances = np.zeros(draft_count)
+                np.maximum.at(max_distances, draft_of[assigned], member_distances)
+                centroid_distances = np.linalg.norm(draft_centroids[:draft_count] - vector, axis=1)
+                centroid_distances[max_distances > self.refine_eps] = np.inf
+                candidate = int(np.argmin(centroid_distances))
+                if np.isfinite(centroid_distances[candidate]):
+                    best_index = candidate
 
             if best_index is None:
-                draft_clusters.append(
-                    {
-                        "indices": [int(face_index)],
-                        "centroid": vector.copy(),
-                    }
-                )
+                draft_of[face_index] = draft_count
+                draft_indices.append([face_index])
+                draft_centroids[draft_count] = vector
                 continue
 
-            draft = draft_clusters[best_index]
-            draft["indices"].append(int(face_index))
-            draft["centroid"] = self._centroid(matrix[draft["indices"]])
+            draft_of[face_index] = best_index
+            draft_indices[best_index].append(face_index)
+            draft_centroids[best_index] = self._centroid(matrix[draft_indices[best_index]])
 
         refined_groups: list[list[FaceVector]] = []
-        for draft in draft_clusters:
-            if len(draft["indices"]) < self.min_cluster_size:
+        for indices in draft_indices:
+            if len(indices) < self.min_cluster_size:
                 continue
-            refined_groups.append([faces[index] for index in draft["indices"]])
+            refined_groups.append([faces[index] for index in indices])
         return refined_groups
 
     def _update_dynamic_prototype(
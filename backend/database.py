@@ -7,37 +7,119 @@ upgraded in place without requiring Alembic for this project.
 
 from __future__ import annotations
 
+import json
 import math
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Iterable, Optional
 
+import numpy as np
 from dotenv import load_dotenv
+from loguru import logger
 from sqlalchemy import (
-    JSON,
     Boolean,
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    case,
+    cast,
     create_engine,
+    event,
+    func,
+    insert,
     inspect,
+    or_,
+    select,
     text,
+    true,
+    type_coerce,
+    update,
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import declarative_base, relationship, selectinload, sessionmaker
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 load_dotenv()
 
 Base = declarative_base()
 
+FACE_GENERATION_KEY = "face_id_generation"
+
+SQLITE_PRAGMAS = (
+    # WAL lets API readers proceed while the sync service is writing.
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+class EmbeddingBlob(TypeDecorator):
+    """Face embedding stored as raw float32 bytes (512 bytes for 128 dimensions)."""
+
+    impl = LargeBinary
+    cache_ok = True
+    dtype = np.float32
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return np.ascontiguousarray(value, dtype=self.dtype).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Rows written before the binary migration hold a JSON list, or JSON
+            # ``null`` for clusters without a centroid.
+            decoded = _json_loads(value)
+            if decoded is None:
+                return None
+            return np.asarray(decoded, dtype=self.dtype)
+        return np.frombuffer(value, dtype=self.dtype)
+
+    def compare_values(self, x, y):
+        if x is None or y is None:
+            return x is y
+        return np.array_equal(x, y)
+
+
+class CentroidBlob(EmbeddingBlob):
+    """Cluster centroid stored as raw float64 bytes, so it round-trips exactly."""
+
+    cache_ok = True
+    dtype = np.float64
+
 
 class Photo(Base):
     """Stores metadata about each photo processed."""
 
     __tablename__ = "photos"
+    __table_args__ = (Index("ix_photos_processed_id", "processed", "id"),)
 
     id = Column(Integer, primary_key=True)
     file_path = Column(String, unique=True, nullable=False, index=True)
@@ -49,7 +131,7 @@ class Photo(Base):
     last_seen_at = Column(DateTime, default=datetime.utcnow, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     scanned_at = Column(DateTime)
-    processed = Column(Boolean, default=False, index=True)
+    processed = Column(Boolean, default=False)
     face_count = Column(Integer, default=0)
 
     faces = relationship("Face", back_populates="photo", cascade="all, delete-orphan")
@@ -62,6 +144,7 @@ class Face(Base):
     """Stores individual face detections and their embeddings."""
 
     __tablename__ = "faces"
+    __table_args__ = (Index("ix_faces_cluster_id_id", "cluster_id", "id"),)
 
     id = Column(Integer, primary_key=True)
     photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False, index=True)
@@ -69,9 +152,9 @@ class Face(Base):
     right = Column(Integer)
     bottom = Column(Integer)
     left = Column(Integer)
-    embedding = Column(JSON, nullable=False)
+    embedding = Column(EmbeddingBlob, nullable=False)
     confidence = Column(Float, default=1.0)
-    cluster_id = Column(Integer, ForeignKey("clusters.id"), index=True)
+    cluster_id = Column(Integer, ForeignKey("clusters.id"))
     needs_clustering = Column(Boolean, default=True, index=True)
     cluster_confidence = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -92,7 +175,7 @@ class Cluster(Base):
     name = Column(String, index=True)
     face_count = Column(Integer, default=0)
     representative_face_id = Column(Integer)
-    centroid = Column(JSON)
+    centroid = Column(CentroidBlob)
     is_locked = Column(Boolean, default=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -158,6 +241,18 @@ class SystemSetting(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# Selects the stored float32 bytes as-is, skipping per-row ndarray construction.
+FACE_EMBEDDING_BYTES = type_coerce(Face.embedding, LargeBinary).label("embedding")
+
+
+def stack_embeddings(blobs: list[bytes]) -> np.ndarray:
+    """Decode float32 embedding blobs into one contiguous (N, dim) matrix with a single copy."""
+
+    if not blobs:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.frombuffer(bytearray().join(blobs), dtype=np.float32).reshape(len(blobs), -1)
+
+
 class DatabaseManager:
     """Manages database connections, compatibility upgrades, and common queries."""
 
@@ -169,7 +264,15 @@ class DatabaseManager:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir, exist_ok=True)
 
-        self.engine = create_engine(f"sqlite:///{db_path}", echo=False, future=True)
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            echo=False,
+            future=True,
+            pool_size=int(os.getenv("DATABASE_POOL_SIZE", "20")),
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DATABASE_POOL_TIMEOUT", "30")),
+        )
+        event.listen(self.engine, "connect", _configure_sqlite_connection)
         self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
         Base.metadata.create_all(self.engine)
         self._run_migrations()
@@ -177,6 +280,20 @@ class DatabaseManager:
     def get_session(self):
         return self.Session()
 
+    @contextmanager
+    def session_scope(self):
+        """Run a block of work in one session and commit or roll back once at the end."""
+
+        session = self.get_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def _run_migrations(self) -> None:
         inspector = inspect(self.engine)
         existing_tables = set(inspector.get_table_names())
@@ -210,7 +327,7 @@ class DatabaseManager:
             )
 
         if "clusters" in existing_tables:
-            self._ensure_column(inspector, "clusters", "centroid", "centroid JSON")
+            self._ensure_column(inspector, "clusters", "centroid", "centroid BLOB")
             self._ensure_column(
                 inspector,
                 "clusters",
@@ -235,6 +352,8 @@ class DatabaseManager:
         Base.metadata.create_all(self.engine)
         self._ensure_indexes()
         self._backfill_defaults()
+        self._migrate_embeddings_to_float32()
+        self._migrate_centroids_to_blobs()
 
     def _ensure_column(self, inspector, table: str, column: str, ddl: str) -> None:
         columns = {item["name"] for item in inspector.get_columns(table)}
@@ -246,14 +365,30 @@ class DatabaseManager:
     def _ensure_indexes(self) -> None:
         statements = [
             "CREATE INDEX IF NOT EXISTS ix_faces_needs_clustering ON faces (needs_clustering)",
+            "CREATE INDEX IF NOT EXISTS ix_faces_photo_id ON faces (photo_id)",
+            "CREATE INDEX IF NOT EXISTS ix_faces_cluster_id_id ON faces (cluster_id, id)",
+            # Carries the face box and scores so cluster face lists never touch the
+            # table rows, which are mostly the 512-byte embedding.
+            "CREATE INDEX IF NOT EXISTS ix_faces_cluster_id_photo_id_box ON faces "
+            "(cluster_id, photo_id, top, right, bottom, left, confidence, cluster_confidence)",
             "CREATE INDEX IF NOT EXISTS ix_clusters_name ON clusters (name)",
+            "CREATE INDEX IF NOT EXISTS ix_clusters_face_count_id ON clusters (face_count, id)",
             "CREATE INDEX IF NOT EXISTS ix_clusters_is_locked ON clusters (is_locked)",
             "CREATE INDEX IF NOT EXISTS ix_photos_last_seen_at ON photos (last_seen_at)",
             "CREATE INDEX IF NOT EXISTS ix_photos_modified_timestamp ON photos (modified_timestamp)",
+            "CREATE INDEX IF NOT EXISTS ix_photos_processed_id ON photos (processed, id)",
+            # Superseded by the composite indexes above; keeping both would only
+            # double the write cost of every face and photo update.
+            "DROP INDEX IF EXISTS ix_faces_cluster_id",
+            "DROP INDEX IF EXISTS ix_photos_processed",
+            "DROP INDEX IF EXISTS ix_faces_cluster_id_photo_id",
         ]
         with self.engine.begin() as connection:
             for statement in statements:
                 connection.execute(text(statement))
+            # Refresh planner statistics when they are missing or stale so SQLite
+            # picks between the single-column and composite indexes sensibly.
+            connection.execute(text("PRAGMA optimize"))
 
     def _backfill_defaults(self) -> None:
         with self.engine.begin() as connection:
@@ -279,11 +414,101 @@ class DatabaseManager:
                 )
             )
 
-    @staticmethod
-    def _serialize_embedding(embedding: Any) -> list[float]:
-        if hasattr(embedding, "tolist"):
-            embedding = embedding.tolist()
-        return [float(value) for value in embedding]
+    def _migrate_embeddings_to_float32(self, batch_size: int = 5000) -> None:
+        """Rewrite JSON-encoded embeddings from older databases as float32 blobs, once."""
+
+        if self.get_setting("embedding_storage") == "float32":
+            return
+
+        migrated = 0
+        last_id = 0
+        while True:
+            with self.engine.begin() as connection:
+                rows = connection.execute(
+                    text(
+                        "SELECT id, embedding FROM faces "
+                        "WHERE id > :last_id AND typeof(embedding) = 'text' "
+                        "ORDER BY id LIMIT :limit"
+                    ),
+                    {"last_id": last_id, "limit": batch_size},
+                ).all()
+                if not rows:
+                    break
+                connection.execute(
+                    text("UPDATE faces SET embedding = :embedding WHERE id = :id"),
+                    [
+                        {
+                            "id": row.id,
+                            "embedding": np.asarray(
+                                _json_loads(row.embedding), dtype=np.float32
+                            ).tobytes(),
+                        }
+                        for row in rows
+                    ],
+                )
+            migrated += len(rows)
+            last_id = rows[-1].id
+
+        self.set_setting("embedding_storage", "float32")
+        if migrated:
+            logger.info("Converted {} face embedding(s) to float32 blobs", migrated)
+            # The blobs are about a quarter of the JSON text; hand the freed pages back.
+            with self.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as connection:
+                connection.execute(text("VACUUM"))
+
+    def _migrate_centroids_to_blobs(self) -> None:
+        """Rewrite JSON centroids from older databases as float64 blobs (``null`` as NULL)."""
+
+        with self.engine.begin() as connection:
+            rows = connection.execute(
+                text("SELECT id, centroid FROM clusters WHERE typeof(centroid) = 'text'")
+            ).all()
+            if not rows:
+                return
+            updates = []
+            for row in rows:
+                decoded = _json_loads(row.centroid)
+                updates.append(
+                    {
+                        "id": row.id,
+                        "centroid": (
+                            None
+                            if decoded is None
+                            else np.asarray(decoded, dtype=np.float64).tobytes()
+                        ),
+                    }
+                )
+            connection.execute(
+                text("UPDATE clusters SET centroid = :centroid WHERE id = :id"), updates
+            )
+        logger.info("Converted {} cluster centroid(s) to float64 blobs", len(rows))
+
+    def get_face_generation(self, session) -> int:
+        """Counter bumped whenever faces are deleted, in any process.
+
+        SQLite may hand a deleted face's id to a new face, so caches keyed by face
+        ids include this value.
+        """
+
+        setting = session.get(SystemSetting, FACE_GENERATION_KEY)
+        return int(setting.value) if setting and setting.value else 0
+
+    def _bump_face_generation(self, session) -> None:
+        # One atomic upsert, so concurrent writers in other processes never lose a bump.
+        statement = sqlite_insert(SystemSetting).values(
+            key=FACE_GENERATION_KEY, value="1", updated_at=datetime.utcnow()
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[SystemSetting.key],
+                set_={
+                    "value": cast(cast(SystemSetting.value, Integer) + 1, Text),
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        )
 
     def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
         session = self.get_session()
@@ -307,19 +532,32 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def get_photo_index(self) -> dict[str, dict[str, Any]]:
+    def get_photo_index(self, root_dir: Optional[str] = None) -> dict[str, dict[str, Any]]:
+        """Map file paths to their sync metadata, optionally only under ``root_dir``."""
+
         session = self.get_session()
         try:
-            photos = session.query(Photo).all()
+            query = session.query(
+                Photo.file_path,
+                Photo.id,
+                Photo.file_size,
+                Photo.modified_timestamp,
+                Photo.processed,
+                Photo.face_count,
+            )
+            if root_dir:
+                query = query.filter(
+                    Photo.file_path.startswith(os.path.join(root_dir, ""), autoescape=True)
+                )
             return {
-                photo.file_path: {
-                    "id": photo.id,
-                    "file_size": photo.file_size,
-                    "modified_timestamp": photo.modified_timestamp,
-                    "processed": photo.processed,
-                    "face_count": photo.face_count,
+                row.file_path: {
+                    "id": row.id,
+                    "file_size": row.file_size,
+                    "modified_timestamp": row.modified_timestamp,
+                    "processed": row.processed,
+                    "face_count": row.face_count,
                 }
-                for photo in photos
+                for row in query.yield_per(10000)
             }
         finally:
             session.close()
@@ -336,62 +574,128 @@ class DatabaseManager:
     ) -> tuple[int, str]:
         """Create or update a photo record and report its processing state."""
 
-        session = self.get_session()
-        try:
-            now = datetime.utcnow()
+        with self.session_scope() as session:
             photo = session.query(Photo).filter_by(file_path=file_path).first()
+            photo, state = self._apply_photo_upsert(
+                session,
+                photo,
+                datetime.utcnow(),
+                file_path=file_path,
+                file_size=file_size,
+                file_hash=file_hash,
+                width=width,
+                height=height,
+                modified_timestamp=modified_timestamp,
+                force_reprocess=force_reprocess,
+            )
+            session.flush()
+            return photo.id, state
 
-            if not photo:
-                photo = Photo(
-                    file_path=file_path,
-                    file_size=file_size,
-                    file_hash=file_hash,
-                    width=width,
-                    height=height,
-                    modified_timestamp=modified_timestamp,
-                    last_seen_at=now,
-                    processed=False,
-                    face_count=0,
-                )
-                session.add(photo)
-                session.commit()
-                return photo.id, "new"
-
-            previous_size = photo.file_size
-            previous_mtime = photo.modified_timestamp
+    def upsert_photos(
+        self,
+        entries: list[dict[str, Any]],
+        force_reprocess: bool = False,
+        with_file_hash: bool = False,
+    ) -> list[tuple]:
+        """Batch form of ``upsert_photo``: one lookup query and one commit for all entries.
 
-            photo.file_size = file_size
-            if file_hash is not None:
-                photo.file_hash = file_hash
-            if width is not None:
-                photo.width = width
-            if height is not None:
-                photo.height = height
-            if modified_timestamp is not None:
-                photo.modified_timestamp = modified_timestamp
-            photo.last_seen_at = now
+        With ``with_file_hash`` each result gains a third item: the stored hash when the
+        file's size and mtime still match the row it was computed for, else None.
+        """
 
-            if not photo.processed:
-                changed = True
-                state = "pending"
-            else:
-                changed = force_reprocess
-                state = "changed" if force_reprocess else "unchanged"
+        if not entries:
+            return []
 
-            if not changed:
-                size_changed = previous_size != file_size
-                mtime_changed = not self._float_equals(previous_mtime, modified_timestamp)
-                changed = size_changed or mtime_changed
-                if changed:
-                    state = "changed"
+        with self.session_scope() as session:
+            now = datetime.utcnow()
+            existing = {
+                photo.file_path: photo
+                for photo in session.query(Photo).filter(
+                    Photo.file_path.in_([entry["file_path"] for entry in entries])
+                )
+            }
+            results = []
+            for entry in entries:
+                photo = existing.get(entry["file_path"])
+                known_hash = None
+                if (
+                    photo is not None
+                    and photo.file_hash
+                    and photo.file_size == entry.get("file_size")
+                    and self._float_equals(
+                        photo.modified_timestamp, entry.get("modified_timestamp")
+                    )
+                ):
+                    known_hash = photo.file_hash
+                photo, state = self._apply_photo_upsert(
+                    session, photo, now, force_reprocess=force_reprocess, **entry
+                )
+                results.append((photo, state, known_hash))
+            session.flush()
+            if with_file_hash:
+                return [(photo.id, state, known_hash) for photo, state, known_hash in results]
+            return [(photo.id, state) for photo, state, _ in results]
 
+    def _apply_photo_upsert(
+        self,
+        session,
+        photo: Optional[Photo],
+        now: datetime,
+        file_path: str,
+        file_size: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        modified_timestamp: Optional[float] = None,
+        force_reprocess: bool = False,
+    ) -> tuple[Photo, str]:
+        if not photo:
+            photo = Photo(
+                file_path=file_path,
+                file_size=file_size,
+                file_hash=file_hash,
+                width=width,
+                height=height,
+                modified_timestamp=modified_timestamp,
+                last_seen_at=now,
+                processed=False,
+                face_count=0,
+            )
+            session.add(photo)
+            return photo, "new"
+
+        previous_size = photo.file_size
+        previous_mtime = photo.modified_timestamp
+
+        photo.file_size = file_size
+        if file_hash is not None:
+            photo.file_hash = file_hash
+        if width is not None:
+            photo.width = width
+        if height is not None:
+            photo.height = height
+        if modified_timestamp is not None:
+            photo.modified_timestamp = modified_timestamp
+        photo.last_seen_at = now
+
+        if not photo.processed:
+            changed = True
+            state = "pending"
+        else:
+            changed = force_reprocess
+            state = "changed" if force_reprocess else "unchanged"
+
+        if not changed:
+            size_changed = previous_size != file_size
+            mtime_changed = not self._float_equals(previous_mtime, modified_timestamp)
+            changed = size_changed or mtime_changed
             if changed:
-                photo.processed = False
+                state = "changed"
 
-            session.commit()
-            return photo.id, state if changed else "unchanged"
-        finally:
-            session.close()
+        if changed:
+            photo.processed = False
+
+        return photo, state if changed else "unchanged"
 
     @staticmethod
     def _float_equals(left: Optional[float], right: Optional[float], tolerance: float = 1e-6) -> bool:
@@ -410,27 +714,95 @@ class DatabaseManager:
         height=None,
         modified_timestamp=None,
     ):
-        photo_id, _ = self.upsert_photo(
-            file_path=file_path,
-            file_size=file_size,
-            file_hash=file_hash,
-            width=width,
-            height=height,
-            modified_timestamp=modified_timestamp,
+        with self.session_scope() as session:
+            row = self._photo_upsert_row(
+                datetime.utcnow(), file_path, file_size, file_hash, width, height, modified_timestamp
+            )
+            statement = self._photo_upsert_statement().values(**row).returning(Photo.id)
+            return session.execute(statement).scalar_one()
+
+    def add_photos_bulk(self, rows: list[dict[str, Any]]) -> list[int]:
+        """Upsert many photos (``add_photo`` keyword dicts) in one statement; ids in input order."""
+
+        if not rows:
+            return []
+
+        now = datetime.utcnow()
+        with self.session_scope() as session:
+            statement = self._photo_upsert_statement().returning(
+                Photo.id, sort_by_parameter_order=True
+            )
+            result = session.execute(
+                statement, [self._photo_upsert_row(now, **row) for row in rows]
+            )
+            return list(result.scalars())
+
+    @staticmethod
+    def _photo_upsert_row(
+        now: datetime,
+        file_path: str,
+        file_size: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        modified_timestamp: Optional[float] = None,
+    ) -> dict[str, Any]:
+        return {
+            "file_path": file_path,
+            "file_size": file_size,
+            "file_hash": file_hash,
+            "width": width,
+            "height": height,
+            "modified_timestamp": modified_timestamp,
+            "created_at": now,
+            "last_seen_at": now,
+            "processed": False,
+            "face_count": 0,
+        }
+
+    @staticmethod
+    def _photo_upsert_statement():
+        """``INSERT ... ON CONFLICT(file_path) DO UPDATE`` with ``_apply_photo_upsert`` semantics."""
+
+        statement = sqlite_insert(Photo)
+        excluded = statement.excluded
+        previous_mtime = Photo.modified_timestamp
+        mtime_changed = or_(
+            previous_mtime.is_(None) != excluded.modified_timestamp.is_(None),
+            func.abs(previous_mtime - excluded.modified_timestamp)
+            > func.max(
+                1e-6 * func.max(func.abs(previous_mtime), func.abs(excluded.modified_timestamp)),
+                1e-6,
+            ),
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[Photo.file_path],
+            set_={
+                "file_size": excluded.file_size,
+                "file_hash": func.coalesce(excluded.file_hash, Photo.file_hash),
+                "width": func.coalesce(excluded.width, Photo.width),
+                "height": func.coalesce(excluded.height, Photo.height),
+                "modified_timestamp": func.coalesce(excluded.modified_timestamp, previous_mtime),
+                "last_seen_at": excluded.last_seen_at,
+                "processed": case(
+                    (or_(Photo.file_size.is_not(excluded.file_size), mtime_changed), False),
+                    else_=Photo.processed,
+                ),
+            },
         )
-        return photo_id
 
     def reset_photo_faces(self, photo_id: int) -> int:
         """Delete all faces for a photo so it can be reprocessed safely."""
 
         session = self.get_session()
         try:
-            photo = session.query(Photo).filter_by(id=photo_id).first()
+            photo = session.get(Photo, photo_id)
             if not photo:
                 return 0
             deleted = len(photo.faces)
             for face in list(photo.faces):
                 session.delete(face)
+            self._bump_face_generation(session)
             photo.face_count = 0
             photo.processed = False
             session.commit()
@@ -447,7 +819,7 @@ class DatabaseManager:
     ) -> None:
         session = self.get_session()
         try:
-            photo = session.query(Photo).filter_by(id=photo_id).first()
+            photo = session.get(Photo, photo_id)
             if not photo:
                 return
             photo.processed = True
@@ -461,6 +833,40 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def _insert_faces(self, session, photo_id: int, faces: list[dict[str, Any]]) -> list[int]:
+        if not faces:
+            return []
+        rows = [
+            {
+                "photo_id": photo_id,
+                "embedding": face["embedding"],
+                "top": face["top"],
+                "right": face["right"],
+                "bottom": face["bottom"],
+                "left": face["left"],
+                "confidence": face.get("confidence", 1.0),
+                "needs_clustering": face.get("needs_clustering", True),
+            }
+            for face in faces
+        ]
+        # One multi-row INSERT ... RETURNING, without building ORM objects per face.
+        return list(
+            session.scalars(
+                insert(Face).returning(Face.id, sort_by_parameter_order=True), rows
+            )
+        )
+
+    def add_faces_bulk(self, photo_id: int, faces: list[dict[str, Any]]) -> list[int]:
+        """Insert several faces of one photo in a single transaction and return their ids."""
+
+        session = self.get_session()
+        try:
+            face_ids = self._insert_faces(session, photo_id, faces)
+            session.commit()
+            return face_ids
+        finally:
+            session.close()
+
     def add_face(
         self,
         photo_id,
@@ -472,23 +878,20 @@ class DatabaseManager:
         confidence=1.0,
         needs_clustering: bool = True,
     ):
-        session = self.get_session()
-        try:
-            face = Face(
-                photo_id=photo_id,
-                embedding=self._serialize_embedding(embedding),
-                top=top,
-                right=right,
-                bottom=bottom,
-                left=left,
-                confidence=confidence,
-                needs_clustering=needs_clustering,
-            )
-            session.add(face)
-            session.commit()
-            return face.id
-        finally:
-            session.close()
+        return self.add_faces_bulk(
+            photo_id,
+            [
+                {
+                    "embedding": embedding,
+                    "top": top,
+                    "right": right,
+                    "bottom": bottom,
+                    "left": left,
+                    "confidence": confidence,
+                    "needs_clustering": needs_clustering,
+                }
+            ],
+        )[0]
 
     def save_photo_processing_result(
         self,
@@ -507,61 +910,104 @@ class DatabaseManager:
         This avoids the expensive one-face-per-commit path during large scans.
         """
 
-        detections = detections or []
-        session = self.get_session()
-        try:
-            photo = session.query(Photo).filter_by(id=photo_id).first()
-            if not photo:
-                return []
+        with self.session_scope() as session:
+            return self._apply_processing_result(
+                session,
+                photo_id,
+                file_size=file_size,
+                file_hash=file_hash,
+                width=width,
+                height=height,
+                modified_timestamp=modified_timestamp,
+                detections=detections,
+            )
 
-            if file_size is not None:
-                photo.file_size = file_size
-            if file_hash is not None:
-                photo.file_hash = file_hash
-            if width is not None:
-                photo.width = width
-            if height is not None:
-                photo.height = height
-            if modified_timestamp is not None:
-                photo.modified_timestamp = modified_timestamp
+    def save_photo_processing_results(
+        self, results: list[dict[str, Any]], scan_progress: Optional[dict[str, Any]] = None
+    ) -> list[list[dict[str, int]]]:
+        """Batch form of ``save_photo_processing_result``: many photos, one commit.
 
-            faces = []
-            for location, encoding, confidence in detections:
-                top, right, bottom, left = location
-                faces.append(
-                    Face(
-                        photo_id=photo_id,
-                        embedding=self._serialize_embedding(encoding),
-                        top=top,
-                        right=right,
-                        bottom=bottom,
-                        left=left,
-                        confidence=confidence,
-                        needs_clustering=True,
-                    )
+        Each entry carries ``photo_id`` plus that method's keyword arguments; other keys
+        are ignored. ``scan_progress`` holds ``update_scan_progress`` arguments to write
+        in the same transaction. Returns the persisted faces of each entry, in order.
+        """
+
+        if not results:
+            return []
+
+        fields = ("file_size", "file_hash", "width", "height", "modified_timestamp", "detections")
+        with self.session_scope() as session:
+            # Load every photo up front so the per-photo lookups hit the identity map.
+            session.query(Photo).filter(
+                Photo.id.in_([result["photo_id"] for result in results])
+            ).all()
+            saved = [
+                self._apply_processing_result(
+                    session,
+                    result["photo_id"],
+                    **{field: result.get(field) for field in fields},
                 )
+                for result in results
+            ]
+            if scan_progress is not None:
+                self._apply_scan_progress(session, **scan_progress)
+            return saved
 
-            if faces:
-                session.add_all(faces)
-                session.flush()
+    def _apply_processing_result(
+        self,
+        session,
+        photo_id: int,
+        *,
+        file_size: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        modified_timestamp: Optional[float] = None,
+        detections: Optional[list[tuple[tuple[int, int, int, int], Any, float]]] = None,
+    ) -> list[dict[str, int]]:
+        detections = detections or []
+        photo = session.get(Photo, photo_id)
+        if not photo:
+            return []
 
-            photo.processed = True
-            photo.scanned_at = datetime.utcnow()
-            photo.face_count = len(faces)
-            persisted_faces = [
-                {
-                    "id": face.id,
-                    "top": face.top,
-                    "right": face.right,
-                    "bottom": face.bottom,
-                    "left": face.left,
-                }
-                for face in faces
-            ]
-            session.commit()
-            return persisted_faces
-        finally:
-            session.close()
+        if file_size is not None:
+            photo.file_size = file_size
+        if file_hash is not None:
+            photo.file_hash = file_hash
+        if width is not None:
+            photo.width = width
+        if height is not None:
+            photo.height = height
+        if modified_timestamp is not None:
+            photo.modified_timestamp = modified_timestamp
+
+        faces = [
+            {
+                "embedding": encoding,
+                "top": top,
+                "right": right,
+                "bottom": bottom,
+                "left": left,
+                "confidence": confidence,
+            }
+            for (top, right, bottom, left), encoding, confidence in detections
+        ]
+        face_ids = self._insert_faces(session, photo_id, faces)
+
+        photo.processed = True
+        photo.scanned_at = datetime.utcnow()
+        photo.face_count = len(faces)
+        persisted_faces = [
+            {
+                "id": face_id,
+                "top": face["top"],
+                "right": face["right"],
+                "bottom": face["bottom"],
+                "left": face["left"],
+            }
+            for face_id, face in zip(face_ids, faces)
+        ]
+        return persisted_faces
 
     def get_unprocessed_photos(self, limit=None):
         session = self.get_session()
@@ -573,14 +1019,48 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def get_all_face_embeddings(self, only_clusterable: bool = False):
+    def get_all_face_embeddings(
+        self, only_clusterable: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(face_ids, embeddings)`` as an int64 vector and a float32 matrix."""
+
         session = self.get_session()
         try:
-            query = session.query(Face)
+            query = session.query(Face.id, FACE_EMBEDDING_BYTES)
             if only_clusterable:
                 query = query.filter(Face.cluster_id.is_(None))
-            faces = query.all()
-            return [(face.id, face.embedding) for face in faces]
+            face_ids = []
+            blobs = []
+            for face_id, blob in query.order_by(Face.id).yield_per(10000):
+                face_ids.append(face_id)
+                blobs.append(blob)
+            return np.asarray(face_ids, dtype=np.int64), stack_embeddings(blobs)
+        finally:
+            session.close()
+
+    def get_face_boxes_by_photo(self, clustered_only: bool = True) -> dict[str, list[dict]]:
+        """Group face boxes under their source photo path for batch cropping."""
+
+        session = self.get_session()
+        try:
+            query = session.query(
+                Face.id, Face.top, Face.right, Face.bottom, Face.left, Photo.file_path
+            ).join(Photo, Photo.id == Face.photo_id)
+            if clustered_only:
+                query = query.filter(Face.cluster_id.isnot(None))
+
+            faces_by_photo: dict[str, list[dict]] = {}
+            for row in query.order_by(Face.photo_id, Face.id).all():
+                faces_by_photo.setdefault(row.file_path, []).append(
+                    {
+                        "id": row.id,
+                        "top": row.top,
+                        "right": row.right,
+                        "bottom": row.bottom,
+                        "left": row.left,
+                    }
+                )
+            return faces_by_photo
         finally:
             session.close()
 
@@ -619,6 +1099,13 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def count_pending_cluster_faces(self) -> int:
+        session = self.get_session()
+        try:
+            return session.query(Face).filter(Face.needs_clustering.is_(True)).count()
+        finally:
+            session.close()
+
     def set_faces_needs_clustering(
         self, face_ids: Iterable[int], needs_clustering: bool = True
     ) -> None:
@@ -675,7 +1162,7 @@ class DatabaseManager:
     def update_cluster_name(self, cluster_id, name):
         session = self.get_session()
         try:
-            cluster = session.query(Cluster).filter_by(id=cluster_id).first()
+            cluster = session.get(Cluster, cluster_id)
             if cluster:
                 cluster.name = name
                 cluster.is_locked = True
@@ -687,24 +1174,25 @@ class DatabaseManager:
             session.close()
 
     def update_scan_progress(self, directory, last_path, files_scanned, faces_detected):
-        session = self.get_session()
-        try:
-            progress = (
-                session.query(ScanProgress)
-                .filter_by(directory=directory, completed=False)
-                .first()
+        with self.session_scope() as session:
+            self._apply_scan_progress(
+                session, directory, last_path, files_scanned, faces_detected
             )
-            if not progress:
-                progress = ScanProgress(directory=directory)
-                session.add(progress)
-
-            progress.last_scanned_path = last_path
-            progress.total_files_scanned = files_scanned
-            progress.total_faces_detected = faces_detected
-            progress.updated_at = datetime.utcnow()
-            session.commit()
-        finally:
-            session.close()
+
+    def _apply_scan_progress(self, session, directory, last_path, files_scanned, faces_detected):
+        progress = (
+            session.query(ScanProgress)
+            .filter_by(directory=directory, completed=False)
+            .first()
+        )
+        if not progress:
+            progress = ScanProgress(directory=directory)
+            session.add(progress)
+
+        progress.last_scanned_path = last_path
+        progress.total_files_scanned = files_scanned
+        progress.total_faces_detected = faces_detected
+        progress.updated_at = datetime.utcnow()
 
     def mark_scan_complete(self, directory):
         session = self.get_session()
@@ -724,87 +1212,123 @@ class DatabaseManager:
     def update_cluster_counts(self, cluster_ids: Optional[Iterable[int]] = None):
         """Recompute face counts, centroids, and representative faces."""
 
-        import numpy as np
-
         session = self.get_session()
         try:
-            query = session.query(Cluster)
+            query = session.query(Cluster.id)
             if cluster_ids is not None:
                 cluster_ids = list(cluster_ids)
                 if not cluster_ids:
                     return
                 query = query.filter(Cluster.id.in_(cluster_ids))
+            target_ids = [cluster_id for (cluster_id,) in query]
 
-            clusters = query.all()
-
-            for cluster in clusters:
-                faces = session.query(Face).filter_by(cluster_id=cluster.id).all()
-                cluster.face_count = len(faces)
+            face_query = session.query(Face.id, Face.cluster_id, FACE_EMBEDDING_BYTES)
+            if cluster_ids is not None:
+                face_query = face_query.filter(Face.cluster_id.in_(cluster_ids))
+            else:
+                face_query = face_query.filter(Face.cluster_id.isnot(None))
+            rows = face_query.order_by(Face.id).all()
+            matrix = stack_embeddings([row.embedding for row in rows]).astype(float)
+            indices_by_cluster: dict[int, list[int]] = {}
+            for index, row in enumerate(rows):
+                indices_by_cluster.setdefault(row.cluster_id, []).append(index)
 
-                if not faces:
-                    cluster.centroid = None
-                    cluster.representative_face_id = None
+            now = datetime.utcnow()
+            cluster_updates = []
+            for cluster_id in target_ids:
+                indices = indices_by_cluster.get(cluster_id)
+                if not indices:
+                    cluster_updates.append(
+                        {
+                            "id": cluster_id,
+                            "face_count": 0,
+                            "centroid": None,
+                            "representative_face_id": None,
+                        }
+                    )
                     continue
 
-                matrix = np.array([face.embedding for face in faces], dtype=float)
-                centroid = matrix.mean(axis=0)
-                cluster.centroid = centroid.tolist()
-                cluster.last_clustered_at = datetime.utcnow()
-
-                distances = np.linalg.norm(matrix - centroid, axis=1)
-                representative_index = int(np.argmin(distances))
-                cluster.representative_face_id = faces[representative_index].id
+                cluster_matrix = matrix[indices]
+                centroid = cluster_matrix.mean(axis=0)
+                distances = np.linalg.norm(cluster_matrix - centroid, axis=1)
+                cluster_updates.append(
+                    {
+                        "id": cluster_id,
+                        "face_count": len(indices),
+                        "centroid": centroid,
+                        "last_clustered_at": now,
+                        "representative_face_id": rows[indices[int(np.argmin(distances))]].id,
+                    }
+                )
 
+            if cluster_updates:
+                # ORM bulk UPDATE by primary key, without loading Cluster entities.
+                session.execute(update(Cluster), cluster_updates)
             session.commit()
         finally:
             session.close()
 
     def get_clusters_with_faces(self):
+        """Return live clusters with their faces; face embeddings are left unloaded."""
+
         session = self.get_session()
         try:
-            clusters = session.query(Cluster).filter(Cluster.face_count > 0).all()
-            result = []
-            for cluster in clusters:
-                faces = session.query(Face).filter_by(cluster_id=cluster.id).all()
-                result.append(
-                    {
-                        "id": cluster.id,
-                        "name": cluster.name,
-                        "face_count": cluster.face_count,
-                        "faces": faces,
-                    }
-                )
-            return result
+            clusters = (
+                session.query(Cluster)
+                .options(selectinload(Cluster.faces).defer(Face.embedding, raiseload=True))
+                .filter(Cluster.face_count > 0)
+                .all()
+            )
+            return [
+                {
+                    "id": cluster.id,
+                    "name": cluster.name,
+                    "face_count": cluster.face_count,
+                    "faces": list(cluster.faces),
+                }
+                for cluster in clusters
+            ]
         finally:
             session.close()
 
     def get_stats(self):
         session = self.get_session()
         try:
-            total_photos = session.query(Photo).count()
-            processed_photos = session.query(Photo).filter_by(processed=True).count()
-            total_faces = session.query(Face).count()
-            total_clusters = session.query(Cluster).filter(Cluster.face_count > 0).count()
-            named_clusters = (
-                session.query(Cluster)
-                .filter(Cluster.name.isnot(None), Cluster.face_count > 0)
-                .count()
-            )
-            pending_cluster_faces = (
-                session.query(Face).filter(Face.needs_clustering.is_(True)).count()
-            )
-            unclustered_faces = (
-                session.query(Face).filter(Face.cluster_id.is_(None)).count()
+            # One aggregate pass per table, combined into a single statement.
+            photo_counts = select(
+                func.count().label("total_photos"),
+                func.count().filter(Photo.processed.is_(True)).label("processed_photos"),
+            ).select_from(Photo).subquery()
+            face_counts = select(
+                func.count().label("total_faces"),
+                func.count()
+                .filter(Face.needs_clustering.is_(True))
+                .label("pending_cluster_faces"),
+                func.count().filter(Face.cluster_id.is_(None)).label("unclustered_faces"),
+            ).select_from(Face).subquery()
+            cluster_counts = (
+                select(
+                    func.count().label("total_clusters"),
+                    func.count().filter(Cluster.name.isnot(None)).label("named_clusters"),
+                )
+                .select_from(Cluster)
+                .where(Cluster.face_count > 0)
+                .subquery()
             )
-
+            # Each side is a single row, so the joins just place the counts side by side.
+            row = session.execute(
+                select(photo_counts, face_counts, cluster_counts).select_from(
+                    photo_counts.join(face_counts, true()).join(cluster_counts, true())
+                )
+            ).one()
             return {
-                "total_photos": total_photos,
-                "processed_photos": processed_photos,
-                "total_faces": total_faces,
-                "total_clusters": total_clusters,
-                "named_clusters": named_clusters,
-                "pending_cluster_faces": pending_cluster_faces,
-                "unclustered_faces": unclustered_faces,
+                "total_photos": row.total_photos,
+                "processed_photos": row.processed_photos,
+                "total_faces": row.total_faces,
+                "total_clusters": row.total_clusters,
+                "named_clusters": row.named_clusters,
+                "pending_cluster_faces": row.pending_cluster_faces,
+                "unclustered_faces": row.unclustered_faces,
             }
         finally:
             session.close()
@@ -12,6 +12,7 @@ import importlib
 import importlib.resources
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 from typing import List, Tuple, Optional
@@ -41,6 +42,7 @@ def _install_pkg_resources_compat():
 
 _install_pkg_resources_compat()
 
+import dlib
 import face_recognition
 
 # Enable HEIC/HEIF support for iPhone photos
@@ -51,6 +53,21 @@ try:
 except ImportError:
     logger.warning("pillow-heif not installed - HEIC images won't be supported")
 
+# Optional header-only size reader; PIL is used when it is missing or the format
+# (e.g. HEIC) is unsupported.
+try:
+    import imagesize
+except ImportError:
+    imagesize = None
+
+# Optional libjpeg-turbo decoder for JPEGs. TurboJPEG() also fails when the
+# package is installed but the native library is not, so catch broadly.
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
 # MLX is disabled by default here. Importing it eagerly has been crashing on
 # some local Apple Silicon environments, and this detector path does not
 # actually depend on MLX for inference.
@@ -80,16 +97,37 @@ class FaceDetector:
     Uses MPS (Metal Performance Shaders) for GPU when available.
     """
     
-    def __init__(self, model='hog', use_gpu=True):
+    def __init__(
+        self,
+        model='hog',
+        use_gpu=True,
+        max_side: Optional[int] = None,
+        warm_up: bool = True,
+        min_std: Optional[float] = None,
+    ):
         """
         Initialize the face detector.
         
         Args:
             model: 'hog' (faster, CPU/NPU-optimized) or 'cnn' (more accurate, GPU via MPS)
             use_gpu: Whether to use GPU acceleration (MPS on Apple Silicon)
+            max_side: Downscale images so their longer side fits this before detection
+                (0 = full resolution). Defaults to FACE_DETECTION_MAX_SIDE for 'hog'
+                and full resolution for 'cnn'.
+            warm_up: Run the detector and encoder once on a blank image so their
+                first-call setup is not paid by the first real photo.
+            min_std: Skip detection on images whose pixel standard deviation is below
+                this (blank scans, solid fills). Defaults to FACE_DETECTION_MIN_STD;
+                0 disables the check.
         """
         self.model = model
         self.use_gpu = use_gpu
+        if max_side is None:
+            max_side = 0 if model == 'cnn' else int(os.getenv("FACE_DETECTION_MAX_SIDE", "1600"))
+        self.max_side = max(0, max_side)
+        if min_std is None:
+            min_std = float(os.getenv("FACE_DETECTION_MIN_STD", "0"))
+        self.min_std = max(0.0, min_std)
         
         # Check for Apple Silicon accelerators
         if MLX_AVAILABLE:
@@ -102,6 +140,17 @@ class FaceDetector:
             
         logger.info(f"Initializing FaceDetector with model='{model}', device='{self.device}'")
         logger.info(f"Face detection will use dlib's optimized C++ backend")
+        if warm_up:
+            self._warm_up()
+
+    def _warm_up(self):
+        """Exercise dlib's detector, landmark and embedding models on a tiny image."""
+        blank = np.zeros((64, 64, 3), dtype=np.uint8)
+        try:
+            face_recognition.face_locations(blank, model=self.model)
+            _encode_faces(blank, [(8, 56, 56, 8)])
+        except Exception as exc:
+            logger.debug("Face detector warm-up skipped: {}", exc)
     
     def detect_faces(self, image_path: str) -> Tuple[List, List, List]:
         """
@@ -123,73 +172,241 @@ class FaceDetector:
         try:
             # Load image, with macOS HEIC fallback through sips when pillow-heif
             # is unavailable.
-            image = self._load_image(image_path)
-            
-            # Detect faces
-            face_locations = face_recognition.face_locations(image, model=self.model)
-            
-            if not face_locations:
-                return [], [], []
-            
-            # Generate face encodings (128-dimensional)
-            face_encodings = face_recognition.face_encodings(image, face_locations, num_jitters=1)
-            
-            # face_recognition doesn't provide confidence scores, so we use 1.0
-            confidences = [1.0] * len(face_locations)
-            
-            return face_locations, face_encodings, confidences
+            image, scale = self._load_image(image_path)
+            return self.detect_faces_array(image, scale)
             
         except Exception as e:
             logger.error(f"Error detecting faces in {image_path}: {e}")
             return [], [], []
 
-    def _load_image(self, image_path: str):
+    def detect_faces_array(self, image: np.ndarray, scale: float = 1.0) -> Tuple[List, List, List]:
+        """
+        Detect faces in already decoded RGB pixels.
+
+        Args:
+            image: H x W x 3 uint8 array, e.g. from load_image_for_detection
+            scale: Factor mapping pixel coordinates back to the full-size image
+
+        Returns:
+            Same as detect_faces. Errors propagate to the caller.
+        """
+        if self._is_uniform(image):
+            return [], [], []
+
+        # Detect faces
+        face_locations = face_recognition.face_locations(image, model=self.model)
+        
+        if not face_locations:
+            return [], [], []
+        
+        # Generate face encodings (128-dimensional)
+        face_encodings = _encode_faces(image, face_locations)
+        
+        # face_recognition doesn't provide confidence scores, so we use 1.0
+        confidences = [1.0] * len(face_locations)
+        
+        return self._scale_locations(face_locations, scale), face_encodings, confidences
+
+    def _load_image(self, image_path: str) -> Tuple[np.ndarray, float]:
+        """Return the RGB pixels to detect on and the factor mapping them back to full size."""
         ext = os.path.splitext(image_path)[1].lower()
         if ext not in {".heic", ".heif"}:
-            return face_recognition.load_image_file(image_path)
+            return self._read_image(image_path)
 
         try:
-            return face_recognition.load_image_file(image_path)
+            return self._read_image(image_path)
         except Exception:
             converted = _convert_heic_with_sips(image_path)
             if not converted:
                 raise
             try:
-                return face_recognition.load_image_file(converted)
+                return self._read_image(converted)
             finally:
                 try:
                     os.unlink(converted)
                 except OSError:
                     pass
+
+    def _read_image(self, image_path: str) -> Tuple[np.ndarray, float]:
+        if _turbo_jpeg is not None and os.path.splitext(image_path)[1].lower() in {".jpg", ".jpeg"}:
+            try:
+                return self._read_jpeg_turbo(image_path)
+            except Exception:
+                pass  # e.g. CMYK or progressive quirks; PIL handles those
+        with Image.open(image_path) as image:
+            width = image.width
+            if self.max_side and max(image.size) > self.max_side:
+                # JPEGs decode straight at 1/2, 1/4 or 1/8 scale; the thumbnail finishes the job.
+                image.draft("RGB", (self.max_side, self.max_side))
+                image.thumbnail((self.max_side, self.max_side), Image.Resampling.BILINEAR)
+            pixels = np.asarray(image.convert("RGB"))
+        return pixels, width / pixels.shape[1]
+
+    def _read_jpeg_turbo(self, image_path: str) -> Tuple[np.ndarray, float]:
+        with open(image_path, "rb") as handle:
+            data = handle.read()
+        width, height, _, _ = _turbo_jpeg.decode_header(data)
+        scaling_factor = None
+        longest = max(width, height)
+        if self.max_side and longest > self.max_side:
+            # Like Image.draft: the smallest DCT scale that still covers max_side.
+            for num, denom in sorted(_turbo_jpeg.scaling_factors, key=lambda f: f[0] / f[1]):
+                if num <= denom and -(-longest * num // denom) >= self.max_side:
+                    scaling_factor = (num, denom)
+                    break
+        pixels = _turbo_jpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=scaling_factor)
+        if self.max_side and max(pixels.shape[:2]) > self.max_side:
+            image = Image.fromarray(pixels)
+            image.thumbnail((self.max_side, self.max_side), Image.Resampling.BILINEAR)
+            pixels = np.asarray(image)
+        return pixels, width / pixels.shape[1]
+
+    def _is_uniform(self, image: np.ndarray) -> bool:
+        """Cheap reject: too little contrast to hold a face, judged on a ~64px sample."""
+        if not self.min_std:
+            return False
+        step = max(1, max(image.shape[:2]) // 64)
+        return float(image[::step, ::step].std()) < self.min_std
+
+    @staticmethod
+    def _scale_locations(face_locations, scale: float):
+        if scale == 1.0:
+            return face_locations
+        return [
+            tuple(int(round(value * scale)) for value in location)
+            for location in face_locations
+        ]
     
-    def batch_detect_faces(self, image_paths: List[str]) -> List[Tuple[str, List, List, List]]:
+    def batch_detect_faces(
+        self, image_paths: List[str], batch_size: int = 8
+    ) -> List[Tuple[str, List, List, List]]:
         """
         Detect faces in multiple images.
-        
+
+        With the 'cnn' model, images are loaded concurrently and run through
+        dlib's batched CNN detector, which needs equally sized inputs, so each
+        batch is grouped by image shape first.
+
         Returns:
             List of tuples (image_path, face_locations, face_encodings, confidences)
         """
-        results = []
-        for image_path in image_paths:
-            locations, encodings, confidences = self.detect_faces(image_path)
-            results.append((image_path, locations, encodings, confidences))
-        return results
+        if self.model != "cnn":
+            detections = [self.detect_faces(image_path) for image_path in image_paths]
+            return [
+                (image_path, locations, encodings, confidences)
+                for image_path, (locations, encodings, confidences) in zip(image_paths, detections)
+            ]
+
+        detections = {}
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            for start in range(0, len(image_paths), batch_size):
+                chunk = image_paths[start:start + batch_size]
+                loaded = [
+                    (image_path, *pixels)
+                    for image_path, pixels in zip(
+                        chunk, executor.map(self.load_image_for_detection, chunk)
+                    )
+                    if pixels is not None
+                ]
+                detections.update(self.detect_faces_in_images(loaded))
+
+        return [
+            (image_path, *detections.get(image_path, ([], [], [])))
+            for image_path in image_paths
+        ]
+
+    def detect_faces_in_images(
+        self, loaded: List[Tuple[str, np.ndarray, float]]
+    ) -> dict:
+        """
+        Detect and encode faces in already decoded images.
+
+        Args:
+            loaded: (image_path, pixels, scale) tuples from load_image_for_detection
+
+        Returns:
+            Dict of image_path -> (face_locations, face_encodings, confidences); images
+            whose encoding failed are left out and near-uniform ones (see min_std) map
+            to no faces. The 'cnn' model runs one batched call per image shape.
+        """
+        images_by_shape = {}
+        detections = {}
+        for image_path, image, scale in loaded:
+            if self._is_uniform(image):
+                detections[image_path] = ([], [], [])
+                continue
+            images_by_shape.setdefault(image.shape, []).append((image_path, image, scale))
+
+        for group in images_by_shape.values():
+            images = [image for _, image, _ in group]
+            if self.model == "cnn":
+                try:
+                    batch_locations = face_recognition.batch_face_locations(
+                        images, number_of_times_to_upsample=1, batch_size=len(images)
+                    )
+                except Exception as e:
+                    logger.error(f"Batched CNN detection failed, retrying per image: {e}")
+                    batch_locations = None
+            else:
+                batch_locations = None
+            if batch_locations is None:
+                batch_locations = [
+                    face_recognition.face_locations(image, model=self.model)
+                    for image in images
+                ]
+            for (image_path, image, scale), face_locations in zip(group, batch_locations):
+                try:
+                    face_encodings = _encode_faces(image, face_locations)
+                except Exception as e:
+                    logger.error(f"Error encoding faces in {image_path}: {e}")
+                    continue
+                detections[image_path] = (
+                    self._scale_locations(face_locations, scale),
+                    face_encodings,
+                    [1.0] * len(face_locations),
+                )
+        return detections
+
+    def load_image_for_detection(self, image_path: str) -> Optional[Tuple[np.ndarray, float]]:
+        """Decode an image for detection as (pixels, scale), or None if it can't be read."""
+        if not os.path.exists(image_path):
+            logger.error(f"Image file not found: {image_path}")
+            return None
+        try:
+            return self._load_image(image_path)
+        except Exception as e:
+            logger.error(f"Error loading {image_path}: {e}")
+            return None
     
+    def face_distances_batch(self, known_matrix, unknown_encoding) -> np.ndarray:
+        """
+        Calculate distances from one encoding to many known encodings at once.
+
+        Args:
+            known_matrix: (N, 128) array of known encodings, or a single 128D encoding
+            unknown_encoding: Unknown face encoding to compare
+
+        Returns:
+            float32 array of N distances (a 0-d array for a single known encoding)
+        """
+        # asarray is a no-op for float32 matrices, so callers can keep one around and reuse it.
+        known = np.asarray(known_matrix, dtype=np.float32)
+        unknown = np.asarray(unknown_encoding, dtype=np.float32)
+        return np.linalg.norm(known - unknown, axis=-1)
+
     def compare_faces(self, known_encoding, unknown_encoding, tolerance=0.6):
         """
-        Compare two face encodings.
+        Compare face encodings.
         
         Args:
-            known_encoding: Known face encoding
+            known_encoding: Known face encoding, or an (N, 128) matrix of them
             unknown_encoding: Unknown face encoding to compare
             tolerance: Distance threshold (lower = stricter)
             
         Returns:
-            Boolean indicating if faces match
+            Boolean indicating if faces match (a boolean mask for a matrix)
         """
-        # Calculate Euclidean distance
-        distance = np.linalg.norm(np.array(known_encoding) - np.array(unknown_encoding))
-        return distance <= tolerance
+        return self.face_distances_batch(known_encoding, unknown_encoding) <= tolerance
     
     def face_distance(self, known_encoding, unknown_encoding):
         """
@@ -198,12 +415,39 @@ class FaceDetector:
         Returns:
             Float distance (0 = identical, higher = more different)
         """
-        return float(np.linalg.norm(np.array(known_encoding) - np.array(unknown_encoding)))
+        return float(self.face_distances_batch(known_encoding, unknown_encoding))
+
+
+def _encode_faces(image: np.ndarray, face_locations: List) -> List[np.ndarray]:
+    """
+    128D encodings for every located face, sharing one ResNet forward pass.
+
+    face_recognition.face_encodings runs dlib's network once per face; dlib also
+    accepts all landmark shapes of an image at once. Same landmarks model, jitter
+    and padding as the public API, which remains the fallback.
+    """
+    if not face_locations:
+        return []
+    try:
+        shapes = dlib.full_object_detections(
+            face_recognition.api._raw_face_landmarks(image, face_locations, model="small")
+        )
+        descriptors = face_recognition.api.face_encoder.compute_face_descriptor(image, shapes, 1)
+    except (AttributeError, TypeError):
+        return face_recognition.face_encodings(image, face_locations, num_jitters=1)
+    return [np.array(descriptor) for descriptor in descriptors]
 
 
 def get_image_dimensions(image_path: str) -> Tuple[Optional[int], Optional[int]]:
     """Get image dimensions without loading the full image."""
     ext = os.path.splitext(image_path)[1].lower()
+    if imagesize is not None and ext not in {".heic", ".heif"}:
+        try:
+            width, height = imagesize.get(image_path)
+            if width > 0 and height > 0:
+                return width, height
+        except Exception:
+            pass
     try:
         with Image.open(image_path) as img:
             return img.width, img.height
@@ -4,24 +4,109 @@ Helpers for face crop caching on local disk.
 
 from __future__ import annotations
 
+import io
+import math
+import multiprocessing
 import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 from loguru import logger
 from PIL import Image
 
 try:
-    from pillow_heif import register_heif_opener
+    from pillow_heif import open_heif, register_heif_opener
 
     register_heif_opener()
 except ImportError:
-    pass
+    open_heif = None
 
 
 CACHE_DIR = Path(os.getenv("FACE_CACHE_DIR", "/tmp/photo_face_cache"))
 CACHE_DIR.mkdir(exist_ok=True)
 THUMBNAIL_SIZE = (180, 180)
 FACE_PADDING = int(os.getenv("FACE_CROP_PADDING", "24"))
+HEIF_EXTENSIONS = {".heic", ".heif"}
+# Least recently used files are evicted once the cache grows past this (0 = unbounded).
+CACHE_MAX_BYTES = int(float(os.getenv("FACE_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+PRUNE_EVERY_WRITES = 256
+# 4:2:0 at q85 roughly halves the bytes of q90 without visible loss.
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "85"))
+JPEG_SUBSAMPLING = int(os.getenv("JPEG_SUBSAMPLING", "2"))
+
+
+def save_jpeg(image: Image.Image, target, progressive: bool = False) -> None:
+    image.save(
+        target,
+        format="JPEG",
+        quality=JPEG_QUALITY,
+        subsampling=JPEG_SUBSAMPLING,
+        progressive=progressive,
+    )
+
+
+def encode_jpeg(image: Image.Image) -> bytes:
+    output = io.BytesIO()
+    save_jpeg(image, output)
+    return output.getvalue()
+
+
+_prune_lock = threading.Lock()
+_writes_since_prune = 0
+
+
+def prune_cache(max_bytes: int = CACHE_MAX_BYTES) -> int:
+    """Delete least recently used cache files until the cache fits in ``max_bytes``."""
+
+    if max_bytes <= 0 or not CACHE_DIR.exists():
+        return 0
+
+    entries = []
+    total_size = 0
+    with os.scandir(CACHE_DIR) as iterator:
+        for entry in iterator:
+            if not entry.name.endswith(".jpg"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            total_size += stat.st_size
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+    if total_size <= max_bytes:
+        return 0
+
+    # Trim to 90% so the next few writes don't immediately trigger another pass.
+    target_size = int(max_bytes * 0.9)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total_size <= target_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+        removed += 1
+    logger.info("Evicted {} cached image(s) from {}", removed, CACHE_DIR)
+    return removed
+
+
+def _record_cache_writes(count: int = 1) -> None:
+    global _writes_since_prune
+
+    with _prune_lock:
+        _writes_since_prune += count
+        if _writes_since_prune < PRUNE_EVERY_WRITES:
+            return
+        _writes_since_prune = 0
+    try:
+        prune_cache()
+    except OSError as exc:
+        logger.warning("Failed to prune image cache: {}", exc)
 
 
 def get_face_cache_path(face_id: int, thumbnail: bool = True) -> Path:
@@ -29,12 +114,67 @@ def get_face_cache_path(face_id: int, thumbnail: bool = True) -> Path:
     return CACHE_DIR / f"face_{face_id}{cache_suffix}.jpg"
 
 
-def _prepare_face_crop(image: Image.Image, bounds, thumbnail: bool) -> Image.Image:
-    top, right, bottom, left = bounds
-    left = max(0, left - FACE_PADDING)
-    top = max(0, top - FACE_PADDING)
-    right = min(image.width, right + FACE_PADDING)
-    bottom = min(image.height, bottom + FACE_PADDING)
+def _open_photo(photo_path: str) -> Image.Image:
+    # Decoding through libheif directly skips Pillow's plugin layer and
+    # tone-maps HDR captures to 8 bits, which JPEG needs anyway.
+    if open_heif is not None and Path(photo_path).suffix.lower() in HEIF_EXTENSIONS:
+        return open_heif(photo_path, convert_hdr_to_8bit=True).to_pillow()
+    return Image.open(photo_path)
+
+
+def get_photo_cache_path(photo_id: int) -> Path:
+    return CACHE_DIR / f"photo_{photo_id}.jpg"
+
+
+def build_photo_jpeg_cache(photo_id: int, photo_path: str) -> Path:
+    """Convert a photo to a browser-friendly JPEG once and reuse it while fresh."""
+
+    cache_file = get_photo_cache_path(photo_id)
+    if cache_file.exists() and cache_file.stat().st_mtime >= os.path.getmtime(photo_path):
+        return cache_file
+
+    fd, temp_name = tempfile.mkstemp(prefix=f".{cache_file.stem}.", suffix=".tmp", dir=CACHE_DIR)
+    os.close(fd)
+    temp_file = Path(temp_name)
+    try:
+        with _open_photo(photo_path) as image:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            # Full-size photos render progressively while they stream in.
+            save_jpeg(image, temp_file, progressive=True)
+        os.replace(temp_file, cache_file)
+    finally:
+        temp_file.unlink(missing_ok=True)
+    _record_cache_writes()
+    return cache_file
+
+
+def _draft_for_thumbnails(image: Image.Image, bounds_list) -> float:
+    """Let libjpeg decode at 1/2, 1/4 or 1/8 scale while every crop still fills a thumbnail."""
+
+    if image.format != "JPEG" or not bounds_list:
+        return 1.0
+    smallest_crop = min(
+        max(right - left, bottom - top) + 2 * FACE_PADDING
+        for top, right, bottom, left in bounds_list
+    )
+    scale = max(THUMBNAIL_SIZE) / max(smallest_crop, 1)
+    if scale >= 1.0:
+        return 1.0
+    width, height = image.size
+    image.draft(image.mode, (math.ceil(width * scale), math.ceil(height * scale)))
+    return image.width / width
+
+
+def _prepare_face_crop(
+    image: Image.Image, bounds, thumbnail: bool, scale: float = 1.0
+) -> Image.Image:
+    top, right, bottom, left = (round(value * scale) for value in bounds)
+    padding = round(FACE_PADDING * scale)
+    left = max(0, left - padding)
+    top = max(0, top - padding)
+    right = min(image.width, right + padding)
+    bottom = min(image.height, bottom + padding)
 
     face_image = image.crop((left, top, right, bottom))
     if face_image.mode in {"RGBA", "LA", "P"}:
@@ -54,18 +194,23 @@ def build_face_crop_cache(
     if cache_file.exists():
         return cache_file
 
-    with Image.open(photo_path) as image:
-        face_image = _prepare_face_crop(image, bounds, thumbnail=thumbnail)
-        face_image.save(cache_file, format="JPEG", quality=86, optimize=True)
+    with _open_photo(photo_path) as image:
+        scale = _draft_for_thumbnails(image, [bounds]) if thumbnail else 1.0
+        face_image = _prepare_face_crop(image, bounds, thumbnail=thumbnail, scale=scale)
+        save_jpeg(face_image, cache_file)
+    _record_cache_writes()
     return cache_file
 
 
-def warm_face_crop_cache(photo_path: str, faces: list[dict], thumbnail: bool = True) -> int:
-    if not faces:
-        return 0
-
+def _write_face_crops(photo_path: str, faces: list[dict], thumbnail: bool) -> int:
     cached_count = 0
-    with Image.open(photo_path) as image:
+    with _open_photo(photo_path) as image:
+        scale = 1.0
+        if thumbnail:
+            scale = _draft_for_thumbnails(
+                image,
+                [(face["top"], face["right"], face["bottom"], face["left"]) for face in faces],
+            )
         for face in faces:
             cache_file = get_face_cache_path(face["id"], thumbnail=thumbnail)
             if cache_file.exists():
@@ -75,8 +220,9 @@ def warm_face_crop_cache(photo_path: str, faces: list[dict], thumbnail: bool = T
                     image,
                     (face["top"], face["right"], face["bottom"], face["left"]),
                     thumbnail=thumbnail,
+                    scale=scale,
                 )
-                face_image.save(cache_file, format="JPEG", quality=86, optimize=True)
+                save_jpeg(face_image, cache_file)
                 cached_count += 1
             except Exception as exc:
                 logger.warning(
@@ -86,3 +232,73 @@ def warm_face_crop_cache(photo_path: str, faces: list[dict], thumbnail: bool = T
                     exc,
                 )
     return cached_count
+
+
+def _write_face_crops_safely(photo_path: str, faces: list[dict], thumbnail: bool) -> int:
+    try:
+        return _write_face_crops(photo_path, faces, thumbnail)
+    except Exception as exc:
+        logger.warning("Failed to warm crop cache for {}: {}", photo_path, exc)
+        return 0
+
+
+def warm_face_crop_cache(photo_path: str, faces: list[dict], thumbnail: bool = True) -> int:
+    if not faces:
+        return 0
+
+    cached_count = _write_face_crops(photo_path, faces, thumbnail)
+    if cached_count:
+        _record_cache_writes(cached_count)
+    return cached_count
+
+
+def warm_face_crop_caches(
+    faces_by_photo: dict[str, list[dict]],
+    thumbnail: bool = True,
+    max_workers: int = 1,
+    use_processes: bool = False,
+) -> int:
+    """Build missing crops, decoding each source photo once for all its faces."""
+
+    pending = {}
+    for photo_path, faces in faces_by_photo.items():
+        missing = [
+            face for face in faces if not get_face_cache_path(face["id"], thumbnail=thumbnail).exists()
+        ]
+        if missing:
+            pending[photo_path] = missing
+    if not pending:
+        return 0
+
+    if max_workers <= 1:
+        built = sum(
+            _write_face_crops_safely(photo_path, faces, thumbnail)
+            for photo_path, faces in pending.items()
+        )
+    elif use_processes:
+        # HEIC decoding and the per-face crop loop hold the GIL, so bulk passes
+        # can use processes. Spawn avoids forking a parent that has threads running.
+        chunksize = max(1, len(pending) // (max_workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            built = sum(
+                executor.map(
+                    _write_face_crops_safely,
+                    pending.keys(),
+                    pending.values(),
+                    repeat(thumbnail),
+                    chunksize=chunksize,
+                )
+            )
+    else:
+        # Pillow releases the GIL while decoding JPEGs and resampling, so threads scale here.
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crop-cache") as executor:
+            built = sum(
+                executor.map(
+                    _write_face_crops_safely, pending.keys(), pending.values(), repeat(thumbnail)
+                )
+            )
+    if built:
+        _record_cache_writes(built)
+    return built
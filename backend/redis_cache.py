@@ -10,6 +10,7 @@ import os
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -26,55 +27,98 @@ except ImportError as exc:  # pragma: no cover - exercised when redis isn't inst
 
 @dataclass
 class _MemoryValue:
-    value: str
+    value: Any
     expires_at: Optional[float]
 
 
 class _MemoryBackend:
-    """Best-effort fallback when Redis is unavailable."""
+    """Best-effort fallback when Redis is unavailable.
 
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._values: dict[str, _MemoryValue] = {}
+    Keys under ``evictable_prefix`` (all keys when it is None) live in a TTL LRU
+    bounded by ``max_entries``; other keys, such as locks and sync status, are
+    never evicted. Expired entries are dropped lazily when they are read.
+    """
 
-    def _purge_if_expired(self, key: str) -> None:
-        item = self._values.get(key)
-        if not item:
-            return
-        if item.expires_at is not None and item.expires_at <= time.time():
-            self._values.pop(key, None)
+    def __init__(
+        self, max_entries: Optional[int] = None, evictable_prefix: Optional[str] = None
+    ) -> None:
+        self._lock = threading.Lock()
+        self._values: OrderedDict[Any, _MemoryValue] = OrderedDict()
+        self._pinned: dict[Any, _MemoryValue] = {}
+        self.max_entries = max_entries or int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "1024"))
+        self.evictable_prefix = evictable_prefix
+
+    def _store_for(self, key: Any) -> dict:
+        if self.evictable_prefix is None or (
+            isinstance(key, str) and key.startswith(self.evictable_prefix)
+        ):
+            return self._values
+        return self._pinned
+
+    def _live_item(self, store: dict, key: Any) -> Optional[_MemoryValue]:
+        item = store.get(key)
+        if item is not None and item.expires_at is not None and item.expires_at <= time.time():
+            store.pop(key, None)
+            return None
+        return item
 
     def get(self, key: str) -> Optional[str]:
         with self._lock:
-            self._purge_if_expired(key)
-            item = self._values.get(key)
-            return item.value if item else None
+            store = self._store_for(key)
+            item = self._live_item(store, key)
+            if not item:
+                return None
+            if store is self._values:
+                self._values.move_to_end(key)
+            return item.value
 
     def set(
         self, key: str, value: str, ex: Optional[int] = None, nx: bool = False
     ) -> bool:
         expires_at = time.time() + ex if ex else None
         with self._lock:
-            self._purge_if_expired(key)
-            if nx and key in self._values:
+            store = self._store_for(key)
+            if nx and self._live_item(store, key) is not None:
                 return False
-            self._values[key] = _MemoryValue(value=value, expires_at=expires_at)
+            store[key] = _MemoryValue(value=value, expires_at=expires_at)
+            if store is self._values:
+                self._values.move_to_end(key)
+                while len(self._values) > self.max_entries:
+                    self._values.popitem(last=False)
             return True
 
     def delete(self, *keys: str) -> int:
         deleted = 0
         with self._lock:
             for key in keys:
-                if key in self._values:
-                    self._values.pop(key, None)
+                if self._store_for(key).pop(key, None) is not None:
                     deleted += 1
         return deleted
 
     def keys(self, pattern: str) -> list[str]:
         with self._lock:
-            for key in list(self._values):
-                self._purge_if_expired(key)
-            return [key for key in self._values if fnmatch.fnmatch(key, pattern)]
+            matched = []
+            for store in (self._pinned, self._values):
+                for key in list(store):
+                    if self._live_item(store, key) is not None and fnmatch.fnmatch(key, pattern):
+                        matched.append(key)
+            return matched
+
+
+class TTLLRUCache(_MemoryBackend):
+    """Thread-safe in-process TTL LRU for arbitrary Python values (e.g. numpy arrays)."""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[int] = 3600) -> None:
+        super().__init__(max_entries=maxsize)
+        self.ttl = ttl
+
+    def put(self, key: Any, value: Any) -> None:
+        self.set(key, value, ex=self.ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._pinned.clear()
 
 
 class RedisCache:
@@ -83,7 +127,8 @@ class RedisCache:
     def __init__(self, url: Optional[str] = None, prefix: str = "photo_face") -> None:
         self.prefix = prefix.rstrip(":")
         self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        self._memory_backend = _MemoryBackend()
+        # Only cached API responses are evicted; locks and sync status must persist.
+        self._memory_backend = _MemoryBackend(evictable_prefix=self.namespaced("api:"))
         self._client = None
         self._backend_name = "memory"
         self._connect()
@@ -137,6 +182,12 @@ class RedisCache:
     def set_json(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         return self._set(self.namespaced(key), json.dumps(value), ex=ttl)
 
+    def get_text(self, key: str) -> Optional[str]:
+        return self._get(self.namespaced(key))
+
+    def set_text(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return self._set(self.namespaced(key), value, ex=ttl)
+
     def delete(self, *keys: str) -> int:
         namespaced_keys = [self.namespaced(key) for key in keys]
         return self._delete(*namespaced_keys)
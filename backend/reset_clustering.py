@@ -4,15 +4,10 @@ Reset clustering state while keeping scanned faces and photos.
 
 from __future__ import annotations
 
-import os
-import sys
-
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from backend.database import DatabaseManager
 
 load_dotenv()
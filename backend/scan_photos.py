@@ -5,14 +5,11 @@ CLI entrypoint for library sync and face detection.
 from __future__ import annotations
 
 import sys
-import os
 
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from backend.database import DatabaseManager
 from backend.redis_cache import RedisCache
 from backend.sync_service import SyncService
@@ -7,63 +7,114 @@ clustering only when the library actually changed.
 
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import hashlib
+import multiprocessing
 import os
 import threading
+from collections import deque
+from itertools import islice
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Collection, Iterable, Iterator, Optional
 
 from loguru import logger
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 from backend.clustering_service import ClusteringService
 from backend.database import DatabaseManager
-from backend.image_cache import warm_face_crop_cache
+from backend.image_cache import warm_face_crop_cache, warm_face_crop_caches
 from backend.redis_cache import RedisCache
 
 _worker_state = threading.local()
+PHOTO_UPSERT_BATCH_SIZE = 500
+# Processed photos persisted per transaction (and per progress/status update).
+PERSIST_BATCH_SIZE = 32
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def calculate_file_hash(file_path: str, chunk_size: int = 8192) -> Optional[str]:
-    md5 = hashlib.md5()
+def calculate_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """Content fingerprint: ``xxh3_128:<hex>`` when xxhash is installed, else MD5 hex.
+
+    The prefix keeps both kinds distinguishable when a library holds a mix of them.
+    """
+
+    if xxhash is not None:
+        prefix, new_digest = "xxh3_128:", xxhash.xxh3_128
+    else:
+        prefix, new_digest = "", hashlib.md5
     try:
         with open(file_path, "rb") as handle:
-            while chunk := handle.read(chunk_size):
-                md5.update(chunk)
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: the read loop runs in C with a reusable buffer.
+                digest = hashlib.file_digest(handle, new_digest)
+            else:
+                digest = new_digest()
+                while chunk := handle.read(chunk_size):
+                    digest.update(chunk)
     except Exception as exc:
         logger.error("Failed to hash {}: {}", file_path, exc)
         return None
-    return md5.hexdigest()
+    return prefix + digest.hexdigest()
 
 
 def _should_calculate_hash() -> bool:
     return os.getenv("ENABLE_FILE_HASH", "false").lower() in {"1", "true", "yes"}
 
 
-def find_all_images(root_dir: str, extensions: list[str]) -> list[str]:
-    image_files: list[str] = []
-    root_path = Path(root_dir)
-    if not root_path.exists():
-        return image_files
+def find_all_images(root_dir: str, extensions: Collection[str]) -> list[str]:
+    return [entry.path for entry in iter_image_entries(root_dir, frozenset(extensions))]
+
 
-    for dirpath, _, filenames in os.walk(root_dir):
-        for filename in filenames:
-            file_path = os.path.join(dirpath, filename)
-            if _is_valid_image(file_path, extensions):
-                image_files.append(file_path)
-    return image_files
+def iter_image_entries(root_dir: str, extensions: Collection[str]) -> Iterator[os.DirEntry]:
+    """Yield image files under ``root_dir`` in ``os.walk`` order as ``os.DirEntry``.
 
+    Keeping the entry lets callers stat through it, which is free on Windows and
+    saves a path lookup elsewhere. Symlinked directories are not followed.
+    """
 
-def _is_valid_image(file_path: str, extensions: list[str]) -> bool:
+    if not Path(root_dir).exists():
+        return
+    try:
+        scanner = os.scandir(root_dir)
+    except OSError:
+        return
+
+    subdirectories = []
+    with scanner:
+        for entry in scanner:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    subdirectories.append(entry.path)
+            elif _is_valid_image(entry.name, extensions):
+                yield entry
+    for subdirectory in subdirectories:
+        yield from iter_image_entries(subdirectory, extensions)
+
+
+def _is_valid_image(file_path: str, extensions: Collection[str]) -> bool:
+    """``extensions`` should be a set of lowercase ``.ext`` strings for O(1) lookups."""
     basename = os.path.basename(file_path)
-    if basename.startswith("._") or basename.startswith("."):
+    if basename.startswith("."):
         return False
-    return os.path.splitext(file_path)[1].lower() in extensions
+    return os.path.splitext(basename)[1].lower() in extensions
 
 
 def _resolve_scan_workers(total_files: int) -> int:
@@ -81,8 +132,43 @@ def _resolve_scan_workers(total_files: int) -> int:
     return min(auto_workers, max(total_files, 1))
 
 
+def _resolve_scan_batch_size() -> int:
+    configured = os.getenv("SCAN_BATCH_SIZE", "8")
+    try:
+        return max(1, int(configured))
+    except ValueError:
+        logger.warning("Invalid SCAN_BATCH_SIZE value '{}', using 8.", configured)
+        return 8
+
+
+def _should_scan_with_processes() -> bool:
+    return os.getenv("SCAN_USE_PROCESSES", "false").lower() in {"1", "true", "yes"}
+
+
 def _should_prebuild_face_crops() -> bool:
-    return os.getenv("PREBUILD_FACE_CROPS", "false").lower() in {"1", "true", "yes"}
+    return os.getenv("PREBUILD_FACE_CROPS", "true").lower() in {"1", "true", "yes"}
+
+
+def prebuild_face_crops(db: DatabaseManager, use_processes: bool = False) -> int:
+    """Fill the thumbnail cache for every clustered face that is still missing one.
+
+    ``use_processes`` is meant for the CLI: inside the API, spawned workers would
+    re-import the server module and compete with request threads.
+    """
+
+    if not _should_prebuild_face_crops():
+        return 0
+
+    faces_by_photo = db.get_face_boxes_by_photo(clustered_only=True)
+    built = warm_face_crop_caches(
+        faces_by_photo,
+        thumbnail=True,
+        max_workers=_resolve_scan_workers(len(faces_by_photo)),
+        use_processes=use_processes,
+    )
+    if built:
+        logger.info("Prebuilt {} face thumbnail(s)", built)
+    return built
 
 
 def _get_thread_detector(model: str):
@@ -99,7 +185,12 @@ def _get_thread_detector(model: str):
     return detector
 
 
-def _process_photo_file(item: dict, detection_model: str) -> dict:
+def _warm_scan_worker(model: str) -> None:
+    """Process-pool initializer: load and warm the detector before the first photo."""
+    _get_thread_detector(model)
+
+
+def _process_photo_file(item: dict, detection_model: str, hash_files: bool) -> dict:
     from backend.face_detector import get_image_dimensions
 
     file_path = item["file_path"]
@@ -107,7 +198,7 @@ def _process_photo_file(item: dict, detection_model: str) -> dict:
         **item,
         "width": None,
         "height": None,
-        "file_hash": None,
+        "file_hash": item.get("file_hash"),
         "detections": [],
         "error": None,
     }
@@ -115,7 +206,9 @@ def _process_photo_file(item: dict, detection_model: str) -> dict:
     try:
         detector = _get_thread_detector(detection_model)
         width, height = get_image_dimensions(file_path)
-        file_hash = calculate_file_hash(file_path) if _should_calculate_hash() else None
+        file_hash = result["file_hash"]
+        if file_hash is None and hash_files:
+            file_hash = calculate_file_hash(file_path)
         locations, encodings, confidences = detector.detect_faces(file_path)
 
         result["width"] = width
@@ -128,6 +221,30 @@ def _process_photo_file(item: dict, detection_model: str) -> dict:
         return result
 
 
+def _load_scan_item(item: dict, detector, hash_files: bool) -> tuple[dict, Optional[tuple]]:
+    """Reader stage of the detection pipeline: metadata, optional hash and decoded pixels."""
+
+    from backend.face_detector import get_image_dimensions
+
+    file_path = item["file_path"]
+    result = {
+        **item,
+        "width": None,
+        "height": None,
+        "file_hash": item.get("file_hash"),
+        "detections": [],
+        "error": None,
+    }
+    try:
+        result["width"], result["height"] = get_image_dimensions(file_path)
+        if result["file_hash"] is None and hash_files:
+            result["file_hash"] = calculate_file_hash(file_path)
+    except Exception as exc:
+        result["error"] = str(exc)
+        return result, None
+    return result, detector.load_image_for_detection(file_path)
+
+
 class SyncService:
     """Handles backend library sync and exposes status for the UI."""
 
@@ -247,16 +364,17 @@ class SyncService:
         force_recluster: bool,
         reason: str,
     ) -> dict:
-        extensions = [
-            value.strip().lower()
+        # Lowercase ".ext" set, so each discovered file costs one hash lookup.
+        extensions = frozenset(
+            "." + value.strip().lower().lstrip(".")
             for value in os.getenv(
                 "IMAGE_EXTENSIONS",
                 ".jpg,.jpeg,.png,.bmp,.tiff,.tif,.heic,.heif",
             ).split(",")
             if value.strip()
-        ]
+        )
         detection_model = os.getenv("FACE_DETECTION_MODEL", "hog")
-        image_files = find_all_images(root_dir, extensions)
+        image_entries = list(iter_image_entries(root_dir, extensions))
 
         files_to_process: list[dict] = []
         new_photos = 0
@@ -268,59 +386,45 @@ class SyncService:
                 "message": "Scanning photo library for new files.",
                 "path": root_dir,
                 "reason": reason,
-                "photos_seen": len(image_files),
+                "photos_seen": len(image_entries),
                 "updated_at": _utc_now_iso(),
                 "cache_backend": self.cache.backend_name(),
             }
         )
 
-        for file_path in image_files:
+        discovered: list[dict] = []
+        for entry in image_entries:
             try:
-                stat = os.stat(file_path)
+                stat = entry.stat()
             except OSError as exc:
-                logger.warning("Skipping unreadable file {}: {}", file_path, exc)
+                logger.warning("Skipping unreadable file {}: {}", entry.path, exc)
                 continue
-
-            photo_id, status = self.db.upsert_photo(
-                file_path=file_path,
-                file_size=stat.st_size,
-                modified_timestamp=stat.st_mtime,
-                force_reprocess=force_rescan,
+            discovered.append(
+                {
+                    "file_path": entry.path,
+                    "file_size": stat.st_size,
+                    "modified_timestamp": stat.st_mtime,
+                }
             )
 
-            if status == "new":
-                new_photos += 1
-                files_to_process.append(
-                    {
-                        "photo_id": photo_id,
-                        "file_path": file_path,
-                        "file_size": stat.st_size,
-                        "modified_timestamp": stat.st_mtime,
-                    }
-                )
-                continue
-
-            if status == "pending":
-                files_to_process.append(
-                    {
-                        "photo_id": photo_id,
-                        "file_path": file_path,
-                        "file_size": stat.st_size,
-                        "modified_timestamp": stat.st_mtime,
-                    }
-                )
-                continue
-
-            if status == "changed":
-                changed_photos += 1
-                self.db.reset_photo_faces(photo_id)
+        # Reconcile the index in batches: one lookup and one commit per batch instead of per file.
+        for start in range(0, len(discovered), PHOTO_UPSERT_BATCH_SIZE):
+            batch = discovered[start : start + PHOTO_UPSERT_BATCH_SIZE]
+            results = self.db.upsert_photos(
+                batch, force_reprocess=force_rescan, with_file_hash=True
+            )
+            for entry, (photo_id, status, known_hash) in zip(batch, results):
+                if status == "unchanged":
+                    continue
+                if status == "new":
+                    new_photos += 1
+                elif status == "changed":
+                    changed_photos += 1
+                    self.db.reset_photo_faces(photo_id)
+                # Forced rescans and interrupted scans keep hashes whose size and mtime
+                # still match, so only genuinely new or modified files are re-read.
                 files_to_process.append(
-                    {
-                        "photo_id": photo_id,
-                        "file_path": file_path,
-                        "file_size": stat.st_size,
-                        "modified_timestamp": stat.st_mtime,
-                    }
+                    {"photo_id": photo_id, **entry, "file_hash": known_hash}
                 )
 
         processed_photos = 0
@@ -335,51 +439,59 @@ class SyncService:
                 worker_count,
             )
 
-            def persist_result(result: dict, completed_count: int) -> None:
+            # Read once per scan rather than per file.
+            hash_files = _should_calculate_hash()
+            prebuild_crops = _should_prebuild_face_crops()
+
+            def persist_results(results: list[dict], completed_count: int) -> None:
                 nonlocal processed_photos, detected_faces, processing_errors
 
-                file_path = result["file_path"]
-                if result.get("error"):
-                    processing_errors += 1
-                    logger.error("Failed to process {}: {}", file_path, result["error"])
-                    return
-
-                created_faces = self.db.save_photo_processing_result(
-                    result["photo_id"],
-                    file_size=result.get("file_size"),
-                    file_hash=result.get("file_hash"),
-                    width=result.get("width"),
-                    height=result.get("height"),
-                    modified_timestamp=result.get("modified_timestamp"),
-                    detections=result.get("detections"),
-                )
-                face_count = len(created_faces)
-                processed_photos += 1
-                detected_faces += face_count
-
-                if created_faces and _should_prebuild_face_crops():
-                    try:
-                        warm_face_crop_cache(file_path, created_faces, thumbnail=True)
-                    except Exception as exc:
-                        logger.warning(
-                            "Failed to warm thumbnail cache for {}: {}",
-                            file_path,
-                            exc,
+                successful = []
+                for result in results:
+                    if result.get("error"):
+                        processing_errors += 1
+                        logger.error(
+                            "Failed to process {}: {}", result["file_path"], result["error"]
                         )
-
-                self.db.update_scan_progress(
-                    directory=root_dir,
-                    last_path=file_path,
-                    files_scanned=processed_photos,
-                    faces_detected=detected_faces,
-                )
+                    else:
+                        successful.append(result)
+                if successful:
+                    # One transaction for the whole batch, scan progress included, instead
+                    # of a commit per photo.
+                    saved_faces = self.db.save_photo_processing_results(
+                        successful,
+                        scan_progress={
+                            "directory": root_dir,
+                            "last_path": successful[-1]["file_path"],
+                            "files_scanned": processed_photos + len(successful),
+                            "faces_detected": detected_faces
+                            + sum(len(result["detections"]) for result in successful),
+                        },
+                    )
+                    for result, created_faces in zip(successful, saved_faces):
+                        processed_photos += 1
+                        detected_faces += len(created_faces)
+
+                        if created_faces and prebuild_crops:
+                            try:
+                                warm_face_crop_cache(
+                                    result["file_path"], created_faces, thumbnail=True
+                                )
+                            except Exception as exc:
+                                logger.warning(
+                                    "Failed to warm thumbnail cache for {}: {}",
+                                    result["file_path"],
+                                    exc,
+                                )
+
+                # Error-only batches report too, so pending_photos keeps counting down.
                 self._set_status(
                     {
                         "status": "processing",
                         "message": "Detecting faces in new photos.",
                         "path": root_dir,
                         "reason": reason,
-                        "photos_seen": len(image_files),
+                        "photos_seen": len(image_entries),
                         "new_photos": new_photos,
                         "changed_photos": changed_photos,
                         "processed_photos": processed_photos,
@@ -390,24 +502,45 @@ class SyncService:
                     }
                 )
 
-            if worker_count == 1:
-                for index, item in enumerate(files_to_process, start=1):
-                    result = _process_photo_file(item, detection_model)
-                    persist_result(result, index)
+            def persist_stream(results: Iterable[dict]) -> None:
+                completed_count = 0
+                for batch in _batched(results, PERSIST_BATCH_SIZE):
+                    completed_count += len(batch)
+                    persist_results(batch, completed_count)
+
+            if detection_model == "cnn":
+                self._run_detection_pipeline(
+                    files_to_process, detection_model, worker_count, persist_results, hash_files
+                )
+            elif worker_count == 1:
+                persist_stream(
+                    _process_photo_file(item, detection_model, hash_files)
+                    for item in files_to_process
+                )
             else:
-                with ThreadPoolExecutor(
-                    max_workers=worker_count,
-                    thread_name_prefix="photo-scan",
-                ) as executor:
+                if _should_scan_with_processes():
+                    # Decoding and numpy work run outside the GIL entirely; this process
+                    # only persists results. Spawn avoids forking a threaded server.
+                    executor = ProcessPoolExecutor(
+                        max_workers=worker_count,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_scan_worker,
+                        initargs=(detection_model,),
+                    )
+                else:
+                    executor = ThreadPoolExecutor(
+                        max_workers=worker_count,
+                        thread_name_prefix="photo-scan",
+                    )
+                with executor:
                     futures = [
-                        executor.submit(_process_photo_file, item, detection_model)
+                        executor.submit(_process_photo_file, item, detection_model, hash_files)
                         for item in files_to_process
                     ]
-                    for completed_count, future in enumerate(as_completed(futures), start=1):
-                        persist_result(future.result(), completed_count)
+                    persist_stream(future.result() for future in as_completed(futures))
 
         self.db.mark_scan_complete(root_dir)
-        pending_faces = self.db.get_stats()["pending_cluster_faces"]
+        pending_faces = self.db.count_pending_cluster_faces()
         should_cluster = (
             force_recluster
             or self.clustering_service.needs_rebuild()
@@ -423,7 +556,7 @@ class SyncService:
                     "message": "Updating face clusters.",
                     "path": root_dir,
                     "reason": reason,
-                    "photos_seen": len(image_files),
+                    "photos_seen": len(image_entries),
                     "new_photos": new_photos,
                     "changed_photos": changed_photos,
                     "processed_photos": processed_photos,
@@ -436,6 +569,10 @@ class SyncService:
             clustering_summary = self.clustering_service.run(
                 force_rebuild=force_recluster
             )
+            try:
+                prebuild_face_crops(self.db)
+            except Exception as exc:
+                logger.warning("Failed to prebuild face thumbnails: {}", exc)
 
         summary = {
             "status": "completed",
@@ -446,7 +583,7 @@ class SyncService:
             ),
             "path": root_dir,
             "reason": reason,
-            "photos_seen": len(image_files),
+            "photos_seen": len(image_entries),
             "new_photos": new_photos,
             "changed_photos": changed_photos,
             "processed_photos": processed_photos,
@@ -459,6 +596,77 @@ class SyncService:
         self._set_status(summary)
         return summary
 
+    def _run_detection_pipeline(
+        self,
+        items: list[dict],
+        detection_model: str,
+        reader_count: int,
+        persist_results,
+        hash_files: bool,
+    ) -> None:
+        """Overlap decoding, batched detection and persistence for the CNN detector.
+
+        Reader threads stat, hash and decode photos; this thread runs the detector on
+        up to SCAN_BATCH_SIZE decoded photos that are ready, without waiting for a full
+        batch; a single writer thread persists each batch in one transaction. Readers
+        hold at most 4 x SCAN_BATCH_SIZE photos and the writer at most four batches,
+        so memory stays bounded and the GPU waits on neither disk nor SQLite.
+        """
+
+        batch_size = _resolve_scan_batch_size()
+        max_batches = 4
+        window = max_batches * batch_size
+        detector = _get_thread_detector(detection_model)
+        pending = iter(items)
+        loading: deque = deque()
+        writing: deque = deque()
+        completed_count = 0
+
+        with ThreadPoolExecutor(
+            max_workers=reader_count, thread_name_prefix="photo-read"
+        ) as readers, ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="photo-write"
+        ) as writer:
+
+            def fill_readers() -> None:
+                while len(loading) < window:
+                    item = next(pending, None)
+                    if item is None:
+                        return
+                    loading.append(readers.submit(_load_scan_item, item, detector, hash_files))
+
+            fill_readers()
+            while loading:
+                batch = [loading.popleft().result()]
+                while loading and len(batch) < batch_size and loading[0].done():
+                    batch.append(loading.popleft().result())
+                fill_readers()
+
+                detections = detector.detect_faces_in_images(
+                    [
+                        (result["file_path"], *pixels)
+                        for result, pixels in batch
+                        if pixels is not None
+                    ]
+                )
+                results = []
+                for result, _ in batch:
+                    if not result["error"]:
+                        locations, encodings, confidences = detections.get(
+                            result["file_path"], ([], [], [])
+                        )
+                        result["detections"] = list(zip(locations, encodings, confidences))
+                    results.append(result)
+                completed_count += len(results)
+                writing.append(writer.submit(persist_results, results, completed_count))
+
+                # Surface writer errors promptly and keep the backlog bounded.
+                while writing and (len(writing) > max_batches or writing[0].done()):
+                    writing.popleft().result()
+
+            for future in writing:
+                future.result()
+
     def _set_status(self, payload: dict) -> None:
         self.cache.set_json(self._status_key, payload, ttl=60 * 60 * 24)
         self.cache.delete_prefix("api:stats")
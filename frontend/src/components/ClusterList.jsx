@@ -11,7 +11,7 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
   const [error, setError] = useState(null);
   const [search, setSearch] = useState("");
   const [minFaces, setMinFaces] = useState(1);
-  const [page, setPage] = useState(0);
+  const [cursor, setCursor] = useState(null);
   const [hasMore, setHasMore] = useState(false);
 
   const deferredSearch = useDeferredValue(search.trim());
@@ -21,7 +21,7 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
   );
 
   useEffect(() => {
-    setPage(0);
+    setCursor(null);
     setClusters([]);
   }, [querySignature]);
 
@@ -30,7 +30,7 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
 
     const fetchClusters = async () => {
       try {
-        if (page === 0) {
+        if (cursor === null) {
           setLoading(true);
         } else {
           setLoadingMore(true);
@@ -38,8 +38,9 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
 
         const data = await getClusters({
           min_faces: minFaces,
-          skip: page * PAGE_SIZE,
           limit: PAGE_SIZE,
+          after_face_count: cursor?.faceCount,
+          after_id: cursor?.id,
           search: deferredSearch || undefined,
         });
 
@@ -47,7 +48,9 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
           return;
         }
 
-        setClusters((previous) => (page === 0 ? data : [...previous, ...data]));
+        setClusters((previous) =>
+          cursor === null ? data : [...previous, ...data]
+        );
         setHasMore(data.length === PAGE_SIZE);
         setError(null);
       } catch {
@@ -67,7 +70,7 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
     return () => {
       ignore = true;
     };
-  }, [page, minFaces, deferredSearch, refreshKey]);
+  }, [cursor, minFaces, deferredSearch, refreshKey]);
 
   if (loading && clusters.length === 0) {
     return (
@@ -150,7 +153,10 @@ const ClusterList = ({ onSelectCluster, refreshKey }) => {
         <div className="flex justify-center">
           <button
             type="button"
-            onClick={() => setPage((value) => value + 1)}
+            onClick={() => {
+              const last = clusters[clusters.length - 1];
+              setCursor({ faceCount: last.face_count, id: last.id });
+            }}
             disabled={loadingMore}
             className="secondary-button px-5 py-3 text-sm font-semibold disabled:cursor-not-allowed disabled:opacity-60"
           >
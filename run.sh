@@ -37,6 +37,11 @@ activate_venv() {
     if [ -d ".venv" ]; then
         source .venv/bin/activate
         echo -e "${GREEN}✓ Virtual environment activated${NC}"
+        # Check from / so the repo checkout itself is not on sys.path
+        if ! (cd / && python -c "import backend") > /dev/null 2>&1; then
+            echo -e "${YELLOW}Installing photo_face package (pip install -e .)...${NC}"
+            pip install -q -e "$SCRIPT_DIR"
+        fi
     else
         echo -e "${RED}❌ Virtual environment not found at .venv${NC}"
         echo "Please create it first: python3 -m venv .venv"
@@ -76,7 +81,7 @@ scan_photos() {
     echo -e "${BLUE}   Scanning Photos${NC}"
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
     activate_venv
-    python backend/scan_photos.py "$@"
+    python -m backend.scan_photos "$@"
 }
 
 # Cluster faces
@@ -86,7 +91,7 @@ cluster_faces() {
     echo -e "${BLUE}   Clustering Faces${NC}"
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
     activate_venv
-    python backend/cluster_faces.py "$@"
+    python -m backend.cluster_faces "$@"
 }
 
 # Start API
@@ -96,11 +101,10 @@ start_api() {
     echo -e "${BLUE}   Starting API Server${NC}"
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
     activate_venv
-    cd backend
     echo -e "${GREEN}🚀 API will be available at http://localhost:8000${NC}"
     echo -e "${GREEN}📚 API docs at http://localhost:8000/docs${NC}"
     echo ""
-    python api.py
+    python -m backend.api
 }
 
 # Start frontend
@@ -134,11 +138,9 @@ start_all() {
     else
         echo -e "${YELLOW}Starting API server in background...${NC}"
         activate_venv
-        cd backend
-        python api.py > ../api.log 2>&1 &
+        python -m backend.api > api.log 2>&1 &
         API_PID=$!
-        echo $API_PID > ../api.pid
-        cd ..
+        echo $API_PID > api.pid
         echo -e "${GREEN}✓ API server started (PID: $API_PID)${NC}"
         echo -e "  Log: api.log"
         
@@ -208,7 +210,7 @@ reset_database() {
     
     if [ "$confirm" = "yes" ]; then
         if [ -f "photo_face.db" ]; then
-            rm photo_face.db
+            rm -f photo_face.db photo_face.db-wal photo_face.db-shm
             echo -e "${GREEN}✓ Database deleted${NC}"
             echo -e "${BLUE}Run scan and cluster again to rebuild.${NC}"
         else